@@ -5,17 +5,25 @@
 
 from __future__ import annotations
 
-import collections
 import datetime
 import functools
-import httplib2
 import json
 import logging
 import os
-from typing import Optional
+import time
+from typing import Dict, FrozenSet, Optional
 from dataclasses import dataclass
 
-import subprocess2
+# httplib2 and subprocess2 are imported where they are used: many scripts
+# import this module without ever authenticating, and httplib2 in particular
+# is slow to import.
+
+try:
+    # orjson decodes the luci-auth output bytes directly, without first
+    # decoding them to str. It's optional; fall back to the stdlib.
+    import orjson as _fast_json  # pylint: disable=import-error
+except ImportError:
+    _fast_json = json
 
 # TODO: Should fix these warnings.
 # pylint: disable=line-too-long
@@ -39,42 +47,59 @@ class ReAuthContext:
            exchange for a ReAuth token.
         """
         assert self.project
-        return f"""
-capability[]=authtype
-protocol=https
-host={self.host}
-path={self.project}
-""".lstrip().encode('utf-8')
+        return _git_cred_attrs(self.host, self.project)
+
+
+@functools.lru_cache(maxsize=None)
+def _git_cred_attrs(host: str, project: str) -> bytes:
+    return b''.join((
+        b'capability[]=authtype\nprotocol=https\nhost=',
+        host.encode('utf-8'),
+        b'\npath=',
+        project.encode('utf-8'),
+        b'\n',
+    ))
+
 
+# Mockable time.time for testing.
+def time_now():
+    return time.time()
 
-# Mockable datetime.datetime.utcnow for testing.
-def datetime_now():
-    return datetime.datetime.utcnow()
 
+@dataclass(frozen=True, slots=True)
+class Token:
+    """OAuth access token or ID token with its expiration time.
+
+    The expiration time is in seconds since the epoch, or None if unknown.
+    """
+    token: str
+    expires_at_epoch: Optional[float]
+
+    @property
+    def expires_at(self) -> Optional[datetime.datetime]:
+        """Expiration time as a naive UTC datetime, or None if unknown."""
+        if self.expires_at_epoch is None:
+            return None
+        return datetime.datetime.utcfromtimestamp(self.expires_at_epoch)
 
-# OAuth access token or ID token with its expiration time (UTC datetime or None
-# if unknown).
-class Token(collections.namedtuple('Token', [
-        'token',
-        'expires_at',
-])):
     def needs_refresh(self):
         """True if this token should be refreshed."""
-        if self.expires_at is not None:
-            # Allow 30s of clock skew between client and backend.
-            return datetime_now() + datetime.timedelta(
-                seconds=30) >= self.expires_at
-        # Token without expiration time never expires.
-        return False
+        # Allow 30s of clock skew between client and backend. Token without
+        # expiration time never expires.
+        return (self.expires_at_epoch is not None
+                and time_now() + 30 >= self.expires_at_epoch)
 
 
 class LoginRequiredError(Exception):
     """Interaction with the user is required to authenticate."""
     def __init__(self, scopes=OAUTH_SCOPE_EMAIL):
         self.scopes = scopes
-        msg = ('You are not logged in. Please login first by running:\n'
-               '  %s' % self.login_command)
-        super(LoginRequiredError, self).__init__(msg)
+        super(LoginRequiredError, self).__init__()
+
+    def __str__(self):
+        # Formatted on demand, callers probing for login often drop it.
+        return ('You are not logged in. Please login first by running:\n'
+                '  %s' % self.login_command)
 
     @property
     def login_command(self) -> str:
@@ -87,11 +112,10 @@ class GitLoginRequiredError(Exception):
     This is for git-credential-luci, not luci-auth.
     """
 
-    def __init__(self):
-        msg = (
+    def __str__(self):
+        return (
             'You are not logged in to Gerrit. Please login first by running:\n'
             '  %s' % self.login_command)
-        super(GitLoginRequiredError, self).__init__(msg)
 
     @property
     def login_command(self) -> str:
@@ -104,11 +128,10 @@ class GitReAuthRequiredError(Exception):
     This is for git-credential-luci, not luci-auth.
     """
 
-    def __init__(self):
-        msg = (
+    def __str__(self):
+        return (
             'You have not done ReAuth. Please complete ReAuth first, then try again:\n'
             '  %s' % self.reauth_command)
-        super(GitReAuthRequiredError, self).__init__(msg)
 
     @property
     def reauth_command(self) -> str:
@@ -118,10 +141,9 @@ class GitReAuthRequiredError(Exception):
 class GitUnknownError(Exception):
     """Unknown error from git-credential-luci."""
 
-    def __init__(self):
-        msg = ('Unknown error from git-credential-luci. Try logging in? Run:\n'
-               '  %s' % self.login_command)
-        super(GitLoginRequiredError, self).__init__(msg)
+    def __str__(self):
+        return ('Unknown error from git-credential-luci. Try logging in? Run:\n'
+                '  %s' % self.login_command)
 
     @property
     def login_command(self) -> str:
@@ -133,6 +155,16 @@ def has_luci_context_local_auth():
     ctx_path = os.environ.get('LUCI_CONTEXT')
     if not ctx_path:
         return False
+    try:
+        st = os.stat(ctx_path)
+    except OSError:
+        return False
+    # Keying on mtime and size makes sure a rewritten file is parsed again.
+    return _luci_context_has_local_auth(ctx_path, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _luci_context_has_local_auth(ctx_path, _mtime_ns, _size):
     try:
         with open(ctx_path) as f:
             loaded = json.load(f)
@@ -154,6 +186,10 @@ class Authenticator(object):
         self._scopes = scopes
         self._id_token = None
         self._audience = audience
+        # `luci-auth token` arguments, built once as they never change.
+        self._access_token_args = ('-scopes', scopes)
+        self._id_token_args = ('-use-id-token', ) + (
+            ('-audience', audience) if audience else ())
 
     def has_cached_credentials(self):
         """Returns True if credentials can be obtained.
@@ -217,6 +253,8 @@ class Authenticator(object):
         Returns:
             A modified instance of http that was passed in.
         """
+        import httplib2
+
         # Adapted from oauth2client.OAuth2Credentials.authorize.
         request_orig = http.request
 
@@ -240,22 +278,19 @@ class Authenticator(object):
     ## Private methods.
 
     def _get_luci_auth_token(self, use_id_token=False):
+        import subprocess2
+
         logging.debug('Running luci-auth token')
-        if use_id_token:
-            args = ['-use-id-token'] + ['-audience', self._audience
-                                        ] if self._audience else []
-        else:
-            args = ['-scopes', self._scopes]
+        token_args = (self._id_token_args
+                      if use_id_token else self._access_token_args)
+        args = ['luci-auth', 'token', *token_args, '-json-output', '-']
         try:
-            out, err = subprocess2.check_call_out(['luci-auth', 'token'] +
-                                                  args + ['-json-output', '-'],
+            out, err = subprocess2.check_call_out(args,
                                                   stdout=subprocess2.PIPE,
                                                   stderr=subprocess2.PIPE)
             logging.debug('luci-auth token stderr:\n%s', err)
-            token_info = json.loads(out)
-            return Token(
-                token_info['token'],
-                datetime.datetime.utcfromtimestamp(token_info['expiry']))
+            token_info = _fast_json.loads(out)
+            return Token(token_info['token'], token_info['expiry'])
         except subprocess2.CalledProcessError as e:
             # subprocess2.CalledProcessError.__str__ nicely formats
             # stdout/stderr.
@@ -277,8 +312,12 @@ class GerritAuthenticator(object):
     _GCL_EXITCODE_LOGIN_REQUIRED = 2
     _GCL_EXITCODE_REAUTH_REQUIRED = 3
 
+    # Keys of `git-credential-luci` output read by the methods below.
+    _ACCESS_TOKEN_KEYS = frozenset((b'password', b'password_expiry_utc'))
+    _AUTHORIZATION_KEYS = frozenset((b'authtype', b'credential', b'password'))
+
     def __init__(self):
-        self._access_token: Optional[str] = None
+        self._access_token: Optional[Token] = None
 
     def get_access_token(self) -> str:
         """Returns AccessToken, refreshing it if necessary.
@@ -289,21 +328,36 @@ class GerritAuthenticator(object):
         Raises:
             GitLoginRequiredError: if user login is required.
         """
+        # Reuse the previous token if the helper told us when it expires, to
+        # avoid spawning git-credential-luci for every Gerrit request.
+        if self._access_token and not self._access_token.needs_refresh():
+            return self._access_token.token
+
+        import subprocess2
+
         logging.debug('Running git-credential-luci')
-        env = os.environ.copy()
-        env['LUCI_ENABLE_REAUTH'] = '0'
         out_bytes = self._call_helper(['git-credential-luci', 'get'],
                                       stdin=subprocess2.DEVNULL,
                                       stdout=subprocess2.PIPE,
                                       stderr=subprocess2.PIPE,
-                                      env=env)
-        out = self._parse_creds_helper_out(out_bytes)
+                                      env=self._get_noreauth_env())
+        out = self._parse_creds_helper_out(out_bytes, self._ACCESS_TOKEN_KEYS)
         if password := out.get("password", None):
+            expiry = out.get("password_expiry_utc", "")
+            if expiry.isdigit():
+                self._access_token = Token(password, int(expiry))
             return password
 
         logging.error('git-credential-luci did not return a token')
         raise GitUnknownError()
 
+    def _get_noreauth_env(self) -> Dict[str, str]:
+        """Returns the environment for git-credential-luci with ReAuth off.
+
+        Built on every call, so changes to os.environ are always picked up.
+        """
+        return {**os.environ, 'LUCI_ENABLE_REAUTH': '0'}
+
     def get_authorization_header(self, context: ReAuthContext) -> str:
         """Returns an HTTP Authorization header to authenticate requests.
 
@@ -315,6 +369,8 @@ class GerritAuthenticator(object):
             GitLoginRequiredError: if user login is required.
             GitReAuthRequiredError: if ReAuth is required.
         """
+        import subprocess2
+
         logging.debug('Running git-credential-luci (with reauth)')
         creds_attrs = context.to_git_cred_attrs()
         logging.debug('git-credential-luci stdin:\n%s', creds_attrs)
@@ -329,16 +385,14 @@ class GerritAuthenticator(object):
         raise GitUnknownError()
 
     def _extract_authorization_header(self, out_bytes: bytes) -> Optional[str]:
-        out = self._parse_creds_helper_out(out_bytes)
+        out = self._parse_creds_helper_out(out_bytes, self._AUTHORIZATION_KEYS)
         # Check for ReAuth token and return it's available.
-        authtype = out.get("authtype", None)
-        credential = out.get("credential", None)
-        if authtype and credential:
-            return f"{authtype} {credential}"
+        if "authtype" in out and "credential" in out:
+            return f"{out['authtype']} {out['credential']}"
 
         # If the helper returns non-reauth token, it means ReAuth isn't required and
         # the access token already satisfies the request.
-        if password := out.get("password", None):
+        if password := out.get("password"):
             return f"Bearer {password}"
 
         # If the helper also didn't return an access token, something is wrong.
@@ -346,16 +400,30 @@ class GerritAuthenticator(object):
             'git-credential-luci did not return a token or a ReAuth token')
         return None
 
-    def _parse_creds_helper_out(self, out_bytes: str) -> Dict[str, str]:
+    def _parse_creds_helper_out(
+            self,
+            out_bytes: bytes,
+            keys: Optional[FrozenSet[bytes]] = None) -> Dict[str, str]:
         """Parse credential helper's output to a dictionary.
 
+        If `keys` is given, only those keys are extracted and parsing stops as
+        soon as all of them were found. Keys with empty values are skipped.
+
         Note, this function doesn't handle arrays (e.g. key[]=value).
         """
         result = {}
-        for line in out_bytes.decode().splitlines():
-            if '=' in line:
-                key, value = line.split('=', 1)
-                result[key] = value.strip()
+        # Work on bytes so that only the extracted keys and values get decoded.
+        for line in out_bytes.split(b'\n'):
+            eq = line.find(b'=')
+            if eq < 0:
+                continue
+            key = line[:eq]
+            if keys is not None and key not in keys:
+                continue
+            if value := line[eq + 1:].strip():
+                result[key.decode()] = value.decode()
+                if keys is not None and len(result) == len(keys):
+                    break
         return result
 
     def _call_helper(self, args, **kwargs) -> bytes:
@@ -367,6 +435,8 @@ class GerritAuthenticator(object):
             GitReAuthRequiredError
             GitUnknownError
         """
+        import subprocess2
+
         stdout_stderr, exitcode = subprocess2.communicate(args, **kwargs)
         stdout, stderr = stdout_stderr
         logging.debug('git-credential-luci stderr:\n%s', stderr)
@@ -8,6 +8,10 @@ import sys
 
 _NO_CAFFEINATE_FLAG = '--no-caffeinate'
 
+# Set in the environment of commands run under `caffeinate`, so that nested
+# invocations (e.g. ninja run from a gclient hook) don't spawn another one.
+_CAFFEINATED_ENV = '_DEPOT_TOOLS_CAFFEINATED'
+
 _HELP_MESSAGE = f"""\
 caffeinate:
   {_NO_CAFFEINATE_FLAG}  do not prepend `caffeinate` to ninja command
@@ -23,6 +27,10 @@ def call(args, **call_kwargs):
             print(_HELP_MESSAGE, file=sys.stderr)
         if _NO_CAFFEINATE_FLAG in args:
             args.remove(_NO_CAFFEINATE_FLAG)
-        else:
+        elif os.environ.get(_CAFFEINATED_ENV) != '1':
             args = ['caffeinate'] + args
+            env = call_kwargs.get('env')
+            call_kwargs['env'] = {
+                **(os.environ if env is None else env), _CAFFEINATED_ENV: '1'
+            }
     return subprocess.call(args, **call_kwargs)
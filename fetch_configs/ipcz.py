@@ -6,6 +6,23 @@ import sys
 
 import config_util  # pylint: disable=import-error
 
+_URL = 'https://chromium.googlesource.com/chromium/src/third_party/ipcz'
+
+# The spec doesn't depend on any props, so it's built once. It is serialized
+# to JSON by Config.output(), so it must stay a plain dict; don't mutate it.
+_SPEC = {
+    'type': 'gclient_git',
+    'gclient_git_spec': {
+        'solutions': [{
+            'name': 'ipcz',
+            'url': _URL,
+            'deps_file': 'DEPS',
+            'managed': False,
+            'custom_deps': {},
+        }],
+    },
+}
+
 
 # This class doesn't need an __init__ method, so we disable the warning
 # pylint: disable=no-init
@@ -13,22 +30,8 @@ class Ipcz(config_util.Config):
     """Basic Config class for ipcz."""
 
     @staticmethod
-    def fetch_spec(props):
-        url = 'https://chromium.googlesource.com/chromium/src/third_party/ipcz'
-        solution = {
-            'name': 'ipcz',
-            'url': url,
-            'deps_file': 'DEPS',
-            'managed': False,
-            'custom_deps': {},
-        }
-        spec = {
-            'solutions': [solution],
-        }
-        return {
-            'type': 'gclient_git',
-            'gclient_git_spec': spec,
-        }
+    def fetch_spec(_props):
+        return _SPEC
 
     @staticmethod
     def expected_root(_props):
@@ -7,17 +7,20 @@ from __future__ import annotations
 
 import enum
 from collections.abc import Collection
+import concurrent.futures
 import contextlib
 import functools
 import logging
 import os
-from typing import Callable, Iterable, NamedTuple, TextIO
+from typing import BinaryIO, Callable, Iterable, NamedTuple, TextIO
 import urllib.parse
 
 import gerrit_util
-import newauth
 import scm
 
+# The user's home directory, expanded once at import time.
+_HOME = os.path.expanduser('~')
+
 
 class _ConfigError(Exception):
     """Subclass for errors raised by ConfigWizard.
@@ -36,6 +39,8 @@ class _ConfigMethod(enum.Enum):
 class _ConfigInfo(NamedTuple):
     """Result for ConfigWizard._configure."""
     method: _ConfigMethod
+    # Reason given by the SSO check, if one was run.
+    sso_reason: str = ''
 
 
 class _GitcookiesSituation(NamedTuple):
@@ -78,35 +83,42 @@ class UserInterface(object):
     """Abstracts user interaction for ConfigWizard.
 
     This implementation supports regular terminals.
+
+    Output is buffered and written out before reading input, or when
+    flush() is called.
     """
 
-    _prompts = {
-        None: 'y/n',
-        True: 'Y/n',
-        False: 'y/N',
+    # Suffixes appended to read_yn prompts, keyed by the default answer.
+    _prompt_suffixes = {
+        None: ' [y/n]: ',
+        True: ' [Y/n]: ',
+        False: ' [y/N]: ',
     }
+    _yes_responses = frozenset(('y', 'yes'))
+    _no_responses = frozenset(('n', 'no'))
 
     def __init__(self, stdin: TextIO, stdout: TextIO):
         self._stdin = stdin
         self._stdout = stdout
+        self._buffer: list[str] = []
 
     def read_yn(self, prompt: str, *, default: bool | None = None) -> bool:
         """Reads a yes/no response.
 
         The prompt should end in '?'.
         """
-        prompt = f'{prompt} [{self._prompts[default]}]: '
+        prompt += self._prompt_suffixes[default]
         while True:
-            self._stdout.write(prompt)
-            self._stdout.flush()
+            self.write(prompt)
+            self.flush()
             response = self._stdin.readline().strip().lower()
-            if response in ('y', 'yes'):
+            if response in self._yes_responses:
                 return True
-            if response in ('n', 'no'):
+            if response in self._no_responses:
                 return False
             if not response and default is not None:
                 return default
-            self._stdout.write('Type y or n.\n')
+            self.write('Type y or n.\n')
 
     def read_line(self,
                   prompt: str,
@@ -123,8 +135,8 @@ class UserInterface(object):
         inputs.
         """
         while True:
-            self._stdout.write(f'{prompt}: ')
-            self._stdout.flush()
+            self.write(f'{prompt}: ')
+            self.flush()
             s = self._stdin.readline().rstrip()
             if check(self, s):
                 return s
@@ -134,8 +146,8 @@ class UserInterface(object):
 
         Used to interactively proceed.
         """
-        self._stdout.write(text)
-        self._stdout.flush()
+        self.write(text)
+        self.flush()
         self._stdin.readline()
 
     def write(self, s: str) -> None:
@@ -143,7 +155,14 @@ class UserInterface(object):
 
         The string should usually end in a newline.
         """
-        self._stdout.write(s)
+        self._buffer.append(s)
+
+    def flush(self) -> None:
+        """Write out buffered output."""
+        if self._buffer:
+            self._stdout.write(''.join(self._buffer))
+            self._buffer.clear()
+        self._stdout.flush()
 
 
 RemoteURLFunc = Callable[[], str]
@@ -157,21 +176,32 @@ class ConfigWizard(object):
 
     def __init__(self, *, ui: UserInterface, remote_url_func: RemoteURLFunc):
         self._ui = ui
-        self._remote_url_func = remote_url_func
+        # The remote URL is looked up more than once per run and usually
+        # requires running git, so remember it for this (single-use) instance.
+        self._remote_url_func = functools.lru_cache(maxsize=1)(remote_url_func)
 
         # Internal state
         self._user_actions = []
+        # Instances are single-use, so the working directory is looked up once.
+        self._cwd = os.getcwd()
+        # Maps (scope, canonical key) to the values read from Git config, so
+        # that checks don't query Git again after a write cleared scm's cache.
+        self._config_cache: dict[tuple[str, str], list[str]] = {}
+        # Result of the SSO helper lookup, which searches PATH.
+        self._sso_helper_available: bool | None = None
 
     def run(self, *, force_global: bool) -> None:
-        with self._handle_config_errors():
-            self._run(force_global=force_global)
+        try:
+            with self._handle_config_errors():
+                self._run(force_global=force_global)
+        finally:
+            self._ui.flush()
 
     def _run(self, *, force_global: bool) -> None:
-        self._println('This tool will help check your Gerrit authentication.')
-        self._println(
-            '(Report any issues to https://issues.chromium.org/issues/new?component=1456702&template=2076315)'
-        )
-        self._println()
+        self._print_block(
+            'This tool will help check your Gerrit authentication.\n'
+            '(Report any issues to https://issues.chromium.org/issues/new?component=1456702&template=2076315)\n'
+            '\n')
         self._fix_netrc()
         self._fix_gitcookies()
         self._println()
@@ -208,23 +238,17 @@ class ConfigWizard(object):
     def _run_outside_repo(self) -> None:
         global_email = self._check_global_email()
 
-        self._println()
-        self._println('Since we are not running in a Gerrit repository,')
-        self._println('we do not know which Gerrit host to check.')
-        self._println(
-            'You can re-run this command inside a Gerrit repository to check a specific host,'
-        )
-        self._println('or we can set up some commonly used Gerrit hosts.')
-
-        self._println()
-        self._println(
-            "(If you haven't already set up auth for these Gerrit hosts,")
-        self._println(
-            "and you skip this, then you won't be able to auth to those hosts.")
-        self._println(
-            "This means lots of things will fail, like gclient sync.)")
-
-        self._println()
+        self._print_block(
+            '\n'
+            'Since we are not running in a Gerrit repository,\n'
+            'we do not know which Gerrit host to check.\n'
+            'You can re-run this command inside a Gerrit repository to check a specific host,\n'
+            'or we can set up some commonly used Gerrit hosts.\n'
+            '\n'
+            "(If you haven't already set up auth for these Gerrit hosts,\n"
+            "and you skip this, then you won't be able to auth to those hosts.\n"
+            'This means lots of things will fail, like gclient sync.)\n'
+            '\n')
         if not self._read_yn('Set up commonly used Gerrit hosts?',
                              default=True):
             self._println('Okay, skipping Gerrit host setup.')
@@ -249,29 +273,55 @@ class ConfigWizard(object):
             'webrtc.googlesource.com',
         ]
 
-        self._println()
-        self._println('We will set up auth for the following hosts:')
-        for host in hosts:
-            self._println(f'- {host}')
-        self._println()
+        self._print_block('\nWe will set up auth for the following hosts:\n' +
+                          ''.join(f'- {host}\n' for host in hosts) + '\n')
         self._read_enter()
 
         used_oauth = False
-        for host in hosts:
-            self._println()
-            self._println(f'Checking authentication config for {host}')
-            parts = urllib.parse.urlsplit(f'https://{host}/')
-            info = self._configure_host(parts, global_email, scope='global')
-            if info.method == _ConfigMethod.OAUTH:
-                used_oauth = True
+        summaries: list[tuple[str, str, str]] = []
+        host_parts = [_split_url(f'https://{host}/') for host in hosts]
+        # The SSO checks are network bound, so start all of them up front.
+        executor = None
+        sso_checks = {}
+        if self._check_sso_helper():
+            self._print_block(
+                '\n'
+                'We will check whether SSO is required for each host.\n'
+                '(Note that these checks may require SSO; if you get an error,\n'
+                'you will need to login to SSO and re-run this command.)\n')
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(hosts))
+            sso_checks = {
+                parts:
+                executor.submit(gerrit_util.CheckShouldUseSSO,
+                                _url_review_host(parts), global_email)
+                for parts in host_parts
+            }
+        try:
+            for host, parts in zip(hosts, host_parts):
+                self._println()
+                self._println(f'Checking authentication config for {host}')
+                info = self._configure_host(parts,
+                                            global_email,
+                                            scope='global',
+                                            sso_check=sso_checks.get(parts),
+                                            report_sso=False)
+                if info.method == _ConfigMethod.OAUTH:
+                    used_oauth = True
+                summaries.append((host, info.method.name, info.sso_reason))
+        finally:
+            # Don't keep the user waiting on checks nobody will read, e.g.
+            # after Ctrl-C.
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._print_host_summary(summaries)
         if used_oauth:
             self._print_oauth_instructions()
 
-        self._println()
-        self._println(
-            "If you need to set up any uncommonly used hosts that we didn't set up above,"
-        )
-        self._println('you can set them up manually.')
+        self._print_block(
+            '\n'
+            "If you need to set up any uncommonly used hosts that we didn't set up above,\n"
+            'you can set them up manually.\n')
         self._print_manual_instructions()
 
     def _run_inside_repo(self) -> None:
@@ -282,7 +332,7 @@ class ConfigWizard(object):
         if info.method == _ConfigMethod.OAUTH:
             self._print_oauth_instructions()
 
-        dirs = list(scm.GIT.ListSubmodules(os.getcwd()))
+        dirs = list(scm.GIT.ListSubmodules(self._cwd))
         if dirs:
             self._println()
             self._println('This repository appears to have submodules.')
@@ -301,7 +351,7 @@ class ConfigWizard(object):
         Returns None if current Git repo doesn't have Gerrit remote.
         """
         self._println()
-        self._println(f'Configuring Gerrit auth for {os.getcwd()}')
+        self._println(f'Configuring Gerrit auth for {self._cwd}')
 
         remote_url = self._remote_url_func()
         if not _is_gerrit_url(remote_url):
@@ -324,18 +374,41 @@ class ConfigWizard(object):
             email = local_email
             scope = 'local'
         self._println()
-        parts = urllib.parse.urlsplit(remote_url)
+        parts = _split_url(remote_url)
         return self._configure_host(parts, email, scope=scope)
 
-    def _configure_host(self, parts: urllib.parse.SplitResult, email: str, *,
-                        scope: scm.GitConfigScope) -> _ConfigInfo:
-        """Configure auth for one Gerrit host."""
-        use_sso = self._check_use_sso(parts, email)
-        if use_sso:
+    def _configure_host(
+        self,
+        parts: urllib.parse.SplitResult,
+        email: str,
+        *,
+        scope: scm.GitConfigScope,
+        sso_check: concurrent.futures.Future[gerrit_util.SSOCheckResult]
+        | None = None,
+        report_sso: bool = True,
+    ) -> _ConfigInfo:
+        """Configure auth for one Gerrit host.
+
+        sso_check is an optional, already started, SSO check for the host.
+        If report_sso is False, the SSO decision is not printed; it is
+        returned in the result for the caller to report.
+        """
+        result = self._check_use_sso(parts, email, sso_check=sso_check)
+        reason = ''
+        if result is not None:
+            reason = result.reason
+            if report_sso:
+                text = 'use' if result.status else 'not use'
+                host = _url_review_host(parts)
+                self._println(
+                    f'Decided we should {text} SSO for {email!r} on {host}')
+                self._println(f'Reason: {reason}')
+                self._println()
+        if result is not None and result.status:
             self._configure_sso(parts, scope=scope)
-            return _ConfigInfo(method=_ConfigMethod.SSO)
+            return _ConfigInfo(method=_ConfigMethod.SSO, sso_reason=reason)
         self._configure_oauth(parts, scope=scope)
-        return _ConfigInfo(method=_ConfigMethod.OAUTH)
+        return _ConfigInfo(method=_ConfigMethod.OAUTH, sso_reason=reason)
 
     def _configure_sso(self, parts: urllib.parse.SplitResult, *,
                        scope: scm.GitConfigScope) -> None:
@@ -357,12 +430,12 @@ class ConfigWizard(object):
 
     def _fix_netrc(self) -> None:
         # https://curl.se/libcurl/c/CURLOPT_NETRC_FILE.html
-        netrc_paths = ['~/.netrc']
+        netrc_names = ['.netrc']
         if self._is_windows():
-            netrc_paths.append('~/_netrc')
+            netrc_names.append('_netrc')
 
-        for path in netrc_paths:
-            path = os.path.expanduser(path)
+        for name in netrc_names:
+            path = os.path.join(_HOME, name)
             if os.path.exists(path):
                 self._println(f'You have a netrc file {path!r}')
                 if self._read_yn(
@@ -414,7 +487,7 @@ class ConfigWizard(object):
             self._println('We cannot handle this unusual case right now.')
             raise _ConfigError('unusual gitcookie setup')
 
-        with open(sit.cookiefile, 'r') as f:
+        with open(sit.cookiefile, 'rb') as f:
             info = _parse_cookiefile(f)
 
         if not info.contains_gerrit:
@@ -458,13 +531,23 @@ class ConfigWizard(object):
     def _check_gitcookies(self) -> _GitcookiesSituation:
         """Checks various things about the user's gitcookies situation."""
         gitcookies = self._gitcookies()
-        gitcookies_exists = os.path.exists(gitcookies)
-        cookiefile = os.path.expanduser(
-            scm.GIT.GetConfig(os.getcwd(), 'http.cookiefile', scope='global')
-            or '')
-        cookiefile_exists = os.path.exists(cookiefile)
-        divergent_cookiefiles = gitcookies_exists and cookiefile_exists and not os.path.samefile(
-            gitcookies, cookiefile)
+        gitcookies_stat = _try_stat(gitcookies)
+        gitcookies_exists = gitcookies_stat is not None
+        cookiefile = self._get_config('http.cookiefile', scope='global')
+        if not cookiefile:
+            # Common case: no cookie file configured, nothing else to probe.
+            return _GitcookiesSituation(
+                gitcookies_exists=gitcookies_exists,
+                cookiefile='',
+                cookiefile_exists=False,
+                divergent_cookiefiles=False,
+            )
+        cookiefile = os.path.expanduser(cookiefile)
+        cookiefile_stat = _try_stat(cookiefile)
+        cookiefile_exists = cookiefile_stat is not None
+        divergent_cookiefiles = (
+            gitcookies_stat is not None and cookiefile_stat is not None
+            and not os.path.samestat(gitcookies_stat, cookiefile_stat))
         return _GitcookiesSituation(
             gitcookies_exists=gitcookies_exists,
             cookiefile=cookiefile,
@@ -486,7 +569,7 @@ class ConfigWizard(object):
             return
         rcfile: str | None = None
         options = [
-            os.path.expanduser('~/.bashrc'),
+            os.path.join(_HOME, '.bashrc'),
         ]
 
         for p in options:
@@ -511,8 +594,7 @@ class ConfigWizard(object):
 
         Prompts the user to set it if it isn't set.
         """
-        email = scm.GIT.GetConfig(os.getcwd(), 'user.email',
-                                  scope='global') or ''
+        email = self._get_config('user.email', scope='global')
         if email:
             self._println(f'Your global Git email is: {email}')
             return email
@@ -522,7 +604,7 @@ class ConfigWizard(object):
         if not self._read_yn('Do you want to set one now?', default=True):
             self._println('Will attempt to continue without a global email.')
             return ''
-        name = scm.GIT.GetConfig(os.getcwd(), 'user.name', scope='global') or ''
+        name = self._get_config('user.name', scope='global')
         if not name:
             name = self._read_line('Enter your name (e.g., John Doe)',
                                    check=_check_nonempty)
@@ -533,66 +615,75 @@ class ConfigWizard(object):
 
     def _check_local_email(self) -> str:
         """Checks and returns the user's local Git email."""
-        email = scm.GIT.GetConfig(os.getcwd(), 'user.email',
-                                  scope='local') or ''
+        email = self._get_config('user.email', scope='local')
         if email:
             self._println(
                 f'You have an email configured in your local repo: {email}')
         return email
 
-    def _check_use_sso(self, parts: urllib.parse.SplitResult,
-                       email: str) -> bool:
-        """Checks whether SSO is needed for the given user and host."""
+    def _check_use_sso(
+        self,
+        parts: urllib.parse.SplitResult,
+        email: str,
+        *,
+        sso_check: concurrent.futures.Future[gerrit_util.SSOCheckResult]
+        | None = None
+    ) -> gerrit_util.SSOCheckResult | None:
+        """Checks whether SSO is needed for the given user and host.
+
+        Returns None if the SSO helper is not available.  If sso_check is
+        given, its result is used instead of running the check again.
+        """
         if not self._check_sso_helper():
-            return False
+            return None
+        if sso_check is not None:
+            return sso_check.result()
         host = _url_review_host(parts)
         self._println(f'Checking SSO requirement for {email!r} on {host}')
         self._println(
             '(Note that this check may require SSO; if you get an error,')
         self._println('you will need to login to SSO and re-run this command.)')
-        result = gerrit_util.CheckShouldUseSSO(host, email)
-        text = 'use' if result.status else 'not use'
-        self._println(f'Decided we should {text} SSO for {email!r} on {host}')
-        self._println(f'Reason: {result.reason}')
-        self._println()
-        return result.status
+        # Show progress before the (possibly slow) network request.
+        self._ui.flush()
+        return gerrit_util.CheckShouldUseSSO(host, email)
 
     def _check_sso_helper(self) -> bool:
         """Checks and returns whether SSO helper is available."""
-        return bool(gerrit_util.ssoHelper.find_cmd())
+        if self._sso_helper_available is None:
+            self._sso_helper_available = bool(gerrit_util.ssoHelper.find_cmd())
+        return self._sso_helper_available
 
     # Reused instruction printing
 
     def _print_manual_instructions(self) -> None:
         """Prints manual instructions for setting up auth."""
-        self._println()
-        self._println(
-            'Instructions for manually configuring Gerrit authentication:')
-        self._println(
-            'https://commondatastorage.googleapis.com/chrome-infra-docs/flat/depot_tools/docs/html/depot_tools_gerrit_auth.html'
+        self._print_block(
+            '\n'
+            'Instructions for manually configuring Gerrit authentication:\n'
+            'https://commondatastorage.googleapis.com/chrome-infra-docs/flat/depot_tools/docs/html/depot_tools_gerrit_auth.html\n'
         )
 
     def _print_oauth_instructions(self) -> None:
         """Prints instructions for setting up OAuth helper."""
-        self._println()
-        self._println('We have configured Git to use an OAuth helper.')
-        self._println('The OAuth helper requires its own login.')
+        self._print_block('\n'
+                          'We have configured Git to use an OAuth helper.\n'
+                          'The OAuth helper requires its own login.\n')
         self._println_action(
             "If you haven't yet, run `git credential-luci login` using the same email as Git."
         )
-        self._println(
-            "(If you have already done this, you don't need to do it again.)")
-        self._println(
-            '(However, if you changed your email, you should do this again')
-        self._println("to ensure you're using the right account.)")
+        self._print_block(
+            "(If you have already done this, you don't need to do it again.)\n"
+            '(However, if you changed your email, you should do this again\n'
+            "to ensure you're using the right account.)\n")
 
     # Low level Git config manipulation
 
     def _set_oauth_helper(self, parts: urllib.parse.SplitResult, *,
                           scope: scm.GitConfigScope) -> None:
         cred_key = _creds_helper_key(parts)
-        self._set_config(cred_key, '', modify_all=True, scope=scope)
-        self._set_config(cred_key, 'luci', append=True, scope=scope)
+        if self._get_config_list(cred_key, scope=scope) != ['', 'luci']:
+            self._set_config(cred_key, '', modify_all=True, scope=scope)
+            self._set_config(cred_key, 'luci', append=True, scope=scope)
         self._set_config(_creds_use_http_path_key(parts),
                          'yes',
                          modify_all=True,
@@ -630,6 +721,9 @@ class ConfigWizard(object):
         This should be called at most once per wizard invocation per
         url_key.
         """
+        old = list(old)
+        if self._get_config_list(f'url.{new}.insteadOf', scope=scope) == old:
+            return
         self._set_config(f'url.{new}.insteadOf',
                          None,
                          scope=scope,
@@ -640,6 +734,24 @@ class ConfigWizard(object):
                              append=True,
                              scope=scope)
 
+    def _get_config(self, key: str, *, scope: scm.GitConfigScope) -> str:
+        """Get the last value of a Git config option, or '' if unset."""
+        values = self._get_config_list(key, scope=scope)
+        return values[-1] if values else ''
+
+    def _get_config_list(self, key: str, *,
+                         scope: scm.GitConfigScope) -> list[str]:
+        """Get all values of a Git config option in the given scope.
+
+        Values are cached for the rest of the wizard run.
+        """
+        cache_key = (scope, scm.canonicalize_git_config_key(key))
+        if cache_key not in self._config_cache:
+            self._config_cache[cache_key] = scm.GIT.GetConfigList(self._cwd,
+                                                                  key,
+                                                                  scope=scope)
+        return self._config_cache[cache_key]
+
     def _set_config(self,
                     key: str,
                     value: str | None,
@@ -647,7 +759,21 @@ class ConfigWizard(object):
                     scope: scm.GitConfigScope,
                     modify_all: bool = False,
                     append: bool = False) -> None:
-        """Set a Git config option."""
+        """Set a Git config option.
+
+        Writes that wouldn't change the config are skipped, since each one
+        runs a git subprocess.
+        """
+        current = self._get_config_list(key, scope=scope)
+        if value is None:
+            values = []
+        elif append:
+            values = current + [value]
+        else:
+            values = [value]
+        if values == current:
+            return
+
         scope_msg = f'In your {scope} Git config,'
         if append:
             assert value is not None
@@ -662,12 +788,14 @@ class ConfigWizard(object):
                     action += ', replacing any existing values'
             self._println_notify(f'{scope_msg} {action}')
 
-        scm.GIT.SetConfig(os.getcwd(),
+        scm.GIT.SetConfig(self._cwd,
                           key,
                           value,
                           scope=scope,
                           modify_all=modify_all,
                           append=append)
+        self._config_cache[(scope,
+                            scm.canonicalize_git_config_key(key))] = values
 
     # Low level misc helpers
 
@@ -686,10 +814,23 @@ class ConfigWizard(object):
         """Move file to a backup path."""
         backup = f'{path}.bak'
         n = 1
-        while os.path.exists(backup):
-            n += 1
-            backup = f'{path}.bak{n}'
-        os.rename(path, backup)
+        while True:
+            # Reserve the backup path atomically, so we never clobber an
+            # existing backup.
+            try:
+                os.close(
+                    os.open(backup, os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+                            0o600))
+                break
+            except FileExistsError:
+                n += 1
+                backup = f'{path}.bak{n}'
+        try:
+            os.replace(path, backup)
+        except OSError:
+            # Don't leave the empty placeholder behind.
+            os.unlink(backup)
+            raise
         self._println_notify(f'Moved {path!r} to {backup!r}')
 
     @contextlib.contextmanager
@@ -707,12 +848,11 @@ class ConfigWizard(object):
         """
         if not self._user_actions:
             return
-        self._println()
-        self._println(
-            "However, there are some manual actions that are suggested")
-        self._println("(you don't have to re-run this command afterward):")
-        for s in self._user_actions:
-            self._println(f'- {s}')
+        self._print_block(
+            '\n'
+            'However, there are some manual actions that are suggested\n'
+            "(you don't have to re-run this command afterward):\n" +
+            ''.join(f'- {s}\n' for s in self._user_actions))
 
     def _println_action(self, s: str) -> None:
         """Print a notification about a manual action request from user.
@@ -726,9 +866,20 @@ class ConfigWizard(object):
         """Print a notification about a change we made."""
         self._println(f'>>> {s}')
 
+    def _print_host_summary(self, summaries: list[tuple[str, str,
+                                                        str]]) -> None:
+        """Print a table of (host, auth method, SSO reason) rows."""
+        width = max(len(host) for host, _, _ in summaries)
+        self._print_block('\nAuthentication summary:\n' + ''.join(
+            f'- {host:<{width}}  {method:<5}  {reason}'.rstrip() + '\n'
+            for host, method, reason in summaries))
+
+    def _print_block(self, s: str) -> None:
+        """Print a block of (usually multiple) lines with a single write."""
+        self._ui.write(s if s.endswith('\n') else s + '\n')
+
     def _println(self, s: str = '') -> None:
-        self._ui.write(s)
-        self._ui.write('\n')
+        self._ui.write(s + '\n' if s else '\n')
 
     def _read_yn(self, prompt: str, *, default: bool | None = None) -> bool:
         ret = self._ui.read_yn(prompt, default=default)
@@ -756,7 +907,15 @@ class ConfigWizard(object):
 
         Can be mocked for testing.
         """
-        return os.path.expanduser('~/.gitcookies')
+        return os.path.join(_HOME, '.gitcookies')
+
+
+def _try_stat(path: str) -> os.stat_result | None:
+    """Returns the stat result for path, or None if it can't be stat'ed."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
 
 
 class _CookiefileInfo(NamedTuple):
@@ -765,54 +924,73 @@ class _CookiefileInfo(NamedTuple):
     contains_nongerrit: bool
 
 
-def _parse_cookiefile(f: TextIO) -> _CookiefileInfo:
+def _parse_cookiefile(f: BinaryIO) -> _CookiefileInfo:
     """Checks cookie file contents.
 
+    The file must be opened in binary mode; it is scanned as bytes without
+    decoding, and scanning stops once both kinds of cookies were seen.
+
     Used to guide auth configuration.
     """
     contains_gerrit = False
     contains_nongerrit = False
-    for line in f:
-        if line.lstrip().startswith('#'):
-            continue
-        if not line.strip():
+    for line in f.read().split(b'\n'):
+        line = line.strip()
+        if not line or line.startswith(b'#'):
             continue
-        if '.googlesource.com' in line:
+        if b'.googlesource.com' in line:
             contains_gerrit = True
         else:
             contains_nongerrit = True
+        if contains_gerrit and contains_nongerrit:
+            break
     return _CookiefileInfo(
         contains_gerrit=contains_gerrit,
         contains_nongerrit=contains_nongerrit,
     )
 
 
+# Host suffixes of Gerrit hosts, checked by _is_gerrit_url.
+_GERRIT_SUFFIXES = ('.googlesource.com', '.git.corp.google.com')
+
+
+@functools.lru_cache(maxsize=256)
+def _split_url(url: str) -> urllib.parse.SplitResult:
+    """Splits url, memoized so repeated lookups share one SplitResult."""
+    return urllib.parse.urlsplit(url)
+
+
+@functools.lru_cache(maxsize=32)
 def _is_gerrit_url(url: str) -> bool:
     """Checks if URL is for a Gerrit host."""
     if not url:
         return False
-    parts = urllib.parse.urlsplit(url)
-    if parts.netloc.endswith('.googlesource.com') or parts.netloc.endswith(
-            '.git.corp.google.com'):
-        return True
-    return False
+    return _split_url(url).netloc.endswith(_GERRIT_SUFFIXES)
+
+
+# The URL helpers below are memoized since the same host is formatted several
+# times while configuring it. SplitResult is a (hashable) namedtuple.
 
 
+@functools.lru_cache(maxsize=64)
 def _creds_helper_key(parts: urllib.parse.SplitResult) -> str:
     """Return Git config key for credential helpers."""
     return f'credential.{_url_host_url(parts)}.helper'
 
 
+@functools.lru_cache(maxsize=64)
 def _creds_use_http_path_key(parts: urllib.parse.SplitResult) -> str:
     """Return Git config key for using path with helpers."""
     return f'credential.{_url_host_url(parts)}.useHttpPath'
 
 
+@functools.lru_cache(maxsize=64)
 def _url_gerrit_sso_url(parts: urllib.parse.SplitResult) -> str:
     """Return the base SSO URL for a Gerrit host URL."""
     return f'sso://{_url_shortname(parts)}/'
 
 
+@functools.lru_cache(maxsize=64)
 def _url_host_url(parts: urllib.parse.SplitResult) -> str:
     """Format URL with host only (no path).
 
@@ -822,6 +1000,7 @@ def _url_host_url(parts: urllib.parse.SplitResult) -> str:
     return parts._replace(path='', query='', fragment='').geturl()
 
 
+@functools.lru_cache(maxsize=64)
 def _url_root_url(parts: urllib.parse.SplitResult) -> str:
     """Format URL with root path.
 
@@ -831,6 +1010,7 @@ def _url_root_url(parts: urllib.parse.SplitResult) -> str:
     return parts._replace(path='/', query='', fragment='').geturl()
 
 
+@functools.lru_cache(maxsize=64)
 def _url_review_host(parts: urllib.parse.SplitResult) -> str:
     """Format URL as Gerrit review host.
 
@@ -839,12 +1019,10 @@ def _url_review_host(parts: urllib.parse.SplitResult) -> str:
     return f'{_url_shortname(parts)}-review.googlesource.com'
 
 
+@functools.lru_cache(maxsize=64)
 def _url_shortname(parts: urllib.parse.SplitResult) -> str:
     """Format URL as Gerrit host shortname.
 
     Example: chromium
     """
-    name: str = parts.netloc.split('.')[0]
-    if name.endswith('-review'):
-        name = name[:-len('-review')]
-    return name
+    return parts.netloc.split('.', 1)[0].removesuffix('-review')
@@ -28,7 +28,8 @@ PACKAGE_MANAGER_PATHS = (
 
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.field_types as field_types
 import metadata.fields.custom.cpe_prefix as cpe_prefix_util
@@ -75,6 +76,17 @@ class DependencyMetadata:
         known_fields.SHIPPED_IN_CHROMIUM: known_fields.SHIPPED,
     }
 
+    __slots__ = (
+        "_entries",
+        "_metadata",
+        "_metadata_line_numbers",
+        "_first_line",
+        "_last_line",
+        "_occurrences",
+        "_mitigation_entries",
+        "_vuln_scan_sufficiency",
+    )
+
     def __init__(self):
         # The record of all entries added, including repeated fields.
         self._entries: List[Tuple[str, str]] = []
@@ -95,14 +107,27 @@ class DependencyMetadata:
         self._occurrences: Dict[field_types.MetadataField,
                                 int] = defaultdict(int)
 
+        # The vulnerability ID entries (e.g. 'CVE-2024-12345: description'),
+        # mapping each ID to its latest description.
+        self._mitigation_entries: Dict[str, str] = {}
+
+        # The memoized vuln_scan_sufficiency; reset whenever a field changes.
+        self._vuln_scan_sufficiency: Optional[str] = None
+
     def add_entry(self, field_name: str, field_value: str):
         value = field_value.strip()
         self._entries.append((field_name, value))
 
         field = known_fields.get_field(field_name)
         if field:
-            self._metadata[field] = value
-            self._occurrences[field] += 1
+            self._set_field(field, value)
+        elif mitigated_util.PATTERN_VULN_ID_WITH_ANCHORS.match(field_name):
+            self._mitigation_entries[field_name] = value
+
+    def _set_field(self, field: field_types.MetadataField, value: str):
+        self._metadata[field] = value
+        self._occurrences[field] += 1
+        self._vuln_scan_sufficiency = None
 
     def has_entries(self) -> bool:
         return len(self._entries) > 0
@@ -208,6 +233,7 @@ class DependencyMetadata:
                 self._metadata[main_field] = self._metadata[alias_field]
                 sources[main_field] = alias_field
                 self._metadata.pop(alias_field)
+                self._vuln_scan_sufficiency = None
 
         # Validate values for all present fields.
         for field, value in self._metadata.items():
@@ -351,11 +377,7 @@ class DependencyMetadata:
         return cpe_provided and not (version_is_valid or cpe_has_version)
 
     def _mitigations_from_entries(self) -> Dict[str, str]:
-        result = {}
-        for key, value in self._entries:
-            if mitigated_util.PATTERN_VULN_ID_WITH_ANCHORS.match(key):
-                result[key] = value.strip()
-        return result
+        return dict(self._mitigation_entries)
 
     def _return_as_property(self, field: field_types.MetadataField) -> Any:
         """Helper function to create a property for DependencyMetadata.
@@ -528,7 +550,9 @@ class DependencyMetadata:
             if not u:
                 continue
             for p in PACKAGE_MANAGER_PATHS:
-                if p in u and u.split(p)[-1]:
+                # The package name is whatever follows the last occurrence.
+                _, found, package = u.rpartition(p)
+                if found and package:
                     return True
         return False
 
@@ -549,7 +573,12 @@ class DependencyMetadata:
             - 'ignore:GoogleManaged' if the dependency's update mechanism ends in .GoogleManaged.
             - 'insufficient' otherwise.
         """
+        if self._vuln_scan_sufficiency is None:
+            self._vuln_scan_sufficiency = self._assess_vuln_scan_sufficiency()
+        return self._vuln_scan_sufficiency
 
+    def _assess_vuln_scan_sufficiency(self) -> str:
+        """Computes vuln_scan_sufficiency from the current metadata."""
         if self.cpe_prefix and not self._cpe_prefix_lacks_version():
             return "sufficient:CPE"
         if self.url:
@@ -565,11 +594,13 @@ class DependencyMetadata:
             return "ignore:Canonical"
         if self.is_internal:
             return "ignore:Internal"
-        if self.update_mechanism and self.update_mechanism[0]:
-            if self.update_mechanism[0].lower() == "static":
+        # Narrow the Update Mechanism value once, rather than per check.
+        update_mechanism = self.update_mechanism
+        if update_mechanism and update_mechanism[0]:
+            mechanism, suffix = update_mechanism[0], update_mechanism[1]
+            if mechanism.lower() == "static":
                 return "ignore:Static"
-            if (self.update_mechanism[1]
-                    and self.update_mechanism[1].lower() == "googlemanaged"):
+            if suffix and suffix.lower() == "googlemanaged":
                 return "ignore:GoogleManaged"
 
         return "insufficient"
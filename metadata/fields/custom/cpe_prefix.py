@@ -13,7 +13,8 @@ _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", ".."))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.field_types as field_types
 import metadata.fields.util as util
@@ -47,32 +48,30 @@ def is_adequate_cpe_urn(value) -> bool:
         # Didn't match CPE URN format.
         return False
 
-    cpe_components = m.group(1).split(":")
-    non_empty_components = list(filter(len, cpe_components))
-    return len(non_empty_components) > 0
+    return any(m.group(1).split(":"))
 
 
 def has_version_component(value: str) -> bool:
     """Returns whether a given CPE value has a version component."""
-    if util.matches(_PATTERN_CPE_FORMATTED_STRING, value):
+    # Only CPE 2.3 formatted strings can match the (expensive) formatted
+    # string pattern, so check the prefix first.
+    if (value.startswith("cpe:2.3:")
+            and util.matches(_PATTERN_CPE_FORMATTED_STRING, value)):
         # cpe:2.3:part:vendor:product:version:...
         # The version is the 6th component.
-        parts = value.split(":")
-        if len(parts) >= 6 and parts[5] not in ("*", "-"):
-            return True
-        return False
+        parts = value.split(":", 6)
+        return len(parts) >= 6 and parts[5] not in ("*", "-")
 
     m = _PATTERN_CPE_URN.match(value)
     if m:
         # cpe:/part:vendor:product:version:...
         # The part is optional in the regex group.
         # group(1) will be ":vendor:product:version"
-        cpe_components = m.group(1).split(":")
-        non_empty_components = list(filter(len, cpe_components))
-        # The components list is vendor, product, version, ...
-        # e.g., for "cpe:/a:vendor:product:1.0", non_empty_components is
-        # ["vendor", "product", "1.0"].
-        return len(non_empty_components) > 2
+        # The non-empty components are vendor, product, version, ...
+        # e.g., for "cpe:/a:vendor:product:1.0", they are
+        # "vendor", "product" and "1.0".
+        non_empty_components = sum(1 for c in m.group(1).split(":") if c)
+        return non_empty_components > 2
 
     return False
 
@@ -13,7 +13,8 @@ _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", ".."))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.field_types as field_types
 import metadata.validation_result as vr
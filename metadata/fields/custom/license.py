@@ -4,19 +4,18 @@
 # found in the LICENSE file.
 
 import os
-import re
 import sys
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 
 _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 # The repo's root directory.
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", ".."))
 # Bad delimiter characters.
 BAD_DELIMITERS = ["/", ";", " and ", " or "]
-BAD_DELIMITERS_REGEX = re.compile("|".join(re.escape(delimiter) for delimiter in BAD_DELIMITERS))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.field_types as field_types
 import metadata.fields.util as util
@@ -33,19 +32,17 @@ class LicenseField(field_types.SingleLineTextField):
     def __init__(self):
         super().__init__(name="License")
 
-    def _extract_licenses(self, value: str) -> List[str]:
+    def _extract_licenses(self, value: str) -> Iterator[str]:
         """Split a license field value into its constituent licenses and process each.
 
         Args:
             value: the value to process, e.g. "Apache-2.0, LicenseRef-MIT, bad license"
 
-        Returns: a list of the processed constituent licenses.
-                e.g. ["Apache-2.0, MIT, bad license"]
+        Yields: the processed constituent licenses, lazily so callers can
+                stop early. e.g. "Apache-2.0", "MIT", "bad license"
         """
-        return [
-            allowlist_util.normalize_value(atomic_value)
-            for atomic_value in value.split(self.VALUE_DELIMITER)
-        ]
+        for atomic_value in value.split(self.VALUE_DELIMITER):
+            yield allowlist_util.normalize_value(atomic_value)
 
     def all_licenses_allowed(self, license_field_value: str,
                              is_open_source_project: bool) -> bool:
@@ -54,7 +51,8 @@ class LicenseField(field_types.SingleLineTextField):
         Assumes a non-empty license_field_value.
         """
         return all(
-            allowlist_util.is_license_allowed(license, is_open_source_project)
+            allowlist_util.is_normalized_license_allowed(
+                license, is_open_source_project)
             for license in self._extract_licenses(license_field_value))
 
     def validate(self, value: str) -> Optional[vr.ValidationResult]:
@@ -62,12 +60,23 @@ class LicenseField(field_types.SingleLineTextField):
 
         Note: this field supports multiple values.
         """
+        # Only check each license for bad separators if the whole value has
+        # one; well-formed values skip the per-license scan.
+        has_bad_delimiter = any(delimiter in value
+                                for delimiter in BAD_DELIMITERS)
+        # Fast path for the common case of a single, known license.
+        if (not has_bad_delimiter and self.VALUE_DELIMITER not in value
+                and allowlist_util.is_a_known_license(value)):
+            return None
+
         not_allowlisted = []
+        add_not_allowlisted = not_allowlisted.append
         for license in self._extract_licenses(value):
             if util.is_empty(license):
                 return vr.ValidationError(
                     reason=f"{self._name} has an empty value.")
-            if BAD_DELIMITERS_REGEX.search(license):
+            if has_bad_delimiter and any(delimiter in license
+                                         for delimiter in BAD_DELIMITERS):
                 return vr.ValidationError(
                     reason=f"{self._name} contains a bad license separator. "
                     "Separate licenses by commas only.",
@@ -77,9 +86,10 @@ class LicenseField(field_types.SingleLineTextField):
                         "When given a choice of licenses, choose the most "
                         "permissive one, do not list all options."
                     ])
-            if not allowlist_util.is_a_known_license(license):
+            # _extract_licenses has already normalized the value.
+            if not allowlist_util.is_a_known_normalized_license(license):
                 # Preserve the original casing for the warning message.
-                not_allowlisted.append(license)
+                add_not_allowlisted(license)
 
         if not_allowlisted:
             return vr.ValidationWarning(
@@ -107,4 +117,4 @@ class LicenseField(field_types.SingleLineTextField):
             return None
 
         parts = value.split(self.VALUE_DELIMITER)
-        return list(filter(bool, map(lambda str: str.strip(), parts)))
+        return [s for s in (part.strip() for part in parts) if s]
@@ -50,9 +50,12 @@ from __future__ import annotations
 # 5. Note:
 #   * Remove 'LicenseRef-' prefix from license classifier outputs.
 #   * Case does not matter.
-from typing import List, Tuple
+import functools
+import itertools
+import sys
+from typing import Final, List, Tuple
 
-_ALLOWED_SPDX_LICENSES = frozenset([
+_ALLOWED_SPDX_LICENSES: Final[frozenset[str]] = frozenset([
     # unencumbered.
     # go/keep-sorted start case=no
     "blessing",
@@ -127,7 +130,7 @@ _ALLOWED_SPDX_LICENSES = frozenset([
 
 # These are licenses that are not in the SPDX license list, but are identified
 # by the license classifier.
-_EXTENDED_LICENSE_CLASSIFIERS = frozenset([
+_EXTENDED_LICENSE_CLASSIFIERS: Final[frozenset[str]] = frozenset([
     # unencumbered.
     # go/keep-sorted start case=no
     "AhemFont",
@@ -191,7 +194,7 @@ _EXTENDED_LICENSE_CLASSIFIERS = frozenset([
 
 # These licenses are only allowed in open source projects due to their
 # reciprocal requirements.
-_OPEN_SOURCE_SPDX_LICENSES = frozenset([
+_OPEN_SOURCE_SPDX_LICENSES: Final[frozenset[str]] = frozenset([
     # reciprocal.
     # go/keep-sorted start case=no
     "APSL-2.0",
@@ -206,7 +209,7 @@ _OPEN_SOURCE_SPDX_LICENSES = frozenset([
 
 # TODO(b/388620886): Implement warning when changing to or from these licenses
 # (but not every time the README.chromium file is modified).
-_WITH_PERMISSION_ONLY = frozenset([
+_WITH_PERMISSION_ONLY: Final[frozenset[str]] = frozenset([
     # restricted.
     # go/keep-sorted start case=no
     "CC-BY-SA-3.0",
@@ -232,15 +235,52 @@ _WITH_PERMISSION_ONLY = frozenset([
 
 # These are references to files that are not licenses, but are allowed to be
 # included in the LICENSE field.
-_ALLOWED_REFERENCES = frozenset([
+_ALLOWED_REFERENCES: Final[frozenset[str]] = frozenset([
     "Refer to additional_readme_paths.json",
 ])
 
-_ALLOWED_LICENSES = (_ALLOWED_SPDX_LICENSES
-                     | _EXTENDED_LICENSE_CLASSIFIERS
-                     | _ALLOWED_REFERENCES)
-_ALLOWED_OPEN_SOURCE_LICENSES = _ALLOWED_LICENSES | _OPEN_SOURCE_SPDX_LICENSES
-_ALL_LICENSES = _ALLOWED_OPEN_SOURCE_LICENSES | _WITH_PERMISSION_ONLY
+# Each combined set is built from the base sets in a single pass.
+_ALLOWED_LICENSES: Final[frozenset[str]] = frozenset(
+    itertools.chain(_ALLOWED_SPDX_LICENSES, _EXTENDED_LICENSE_CLASSIFIERS,
+                    _ALLOWED_REFERENCES))
+_ALLOWED_OPEN_SOURCE_LICENSES: Final[frozenset[str]] = frozenset(
+    itertools.chain(_ALLOWED_SPDX_LICENSES, _EXTENDED_LICENSE_CLASSIFIERS,
+                    _ALLOWED_REFERENCES, _OPEN_SOURCE_SPDX_LICENSES))
+_ALL_LICENSES: Final[frozenset[str]] = frozenset(
+    itertools.chain(_ALLOWED_SPDX_LICENSES, _EXTENDED_LICENSE_CLASSIFIERS,
+                    _ALLOWED_REFERENCES, _OPEN_SOURCE_SPDX_LICENSES,
+                    _WITH_PERMISSION_ONLY))
+
+
+def _lowercased(names: frozenset[str]) -> frozenset[str]:
+    # Interned so that the lowercased sets below share one string object
+    # per license.
+    return frozenset(sys.intern(name.lower()) for name in names)
+
+
+# Lowercased copies of the lists above, for case insensitive lookups.
+_ALLOWED_SPDX_LICENSES_LC: Final[frozenset[str]] = _lowercased(
+    _ALLOWED_SPDX_LICENSES)
+_EXTENDED_LICENSE_CLASSIFIERS_LC: Final[frozenset[str]] = _lowercased(
+    _EXTENDED_LICENSE_CLASSIFIERS)
+_OPEN_SOURCE_SPDX_LICENSES_LC: Final[frozenset[str]] = _lowercased(
+    _OPEN_SOURCE_SPDX_LICENSES)
+_WITH_PERMISSION_ONLY_LC: Final[frozenset[str]] = _lowercased(
+    _WITH_PERMISSION_ONLY)
+_ALLOWED_LICENSES_LC: Final[frozenset[str]] = _lowercased(_ALLOWED_LICENSES)
+_ALL_LICENSES_LC: Final[frozenset[str]] = _lowercased(_ALL_LICENSES)
+
+# Bit flags for _LICENSE_VERDICTS.
+_ALWAYS_ALLOWED: Final = 1
+_OPEN_SOURCE_ONLY: Final = 2
+# Maps each lowercased license to the situations in which it is allowed, so
+# that is_license_allowed needs a single lookup.
+_LICENSE_VERDICTS: Final[dict[str, int]] = dict.fromkeys(_ALL_LICENSES_LC, 0)
+for _name in _WITH_PERMISSION_ONLY_LC | _ALLOWED_LICENSES_LC:
+    _LICENSE_VERDICTS[_name] |= _ALWAYS_ALLOWED
+for _name in _OPEN_SOURCE_SPDX_LICENSES_LC:
+    _LICENSE_VERDICTS[_name] |= _OPEN_SOURCE_ONLY
+del _name
 
 
 # TODO(https://crbug.com/452151523): Remove this after migrating downstream
@@ -251,60 +291,79 @@ OPEN_SOURCE_SPDX_LICENSES = _OPEN_SOURCE_SPDX_LICENSES
 WITH_PERMISSION_ONLY = _WITH_PERMISSION_ONLY
 
 
-def _remove_prefix(value: str, prefix: str) -> str:
-    if value.startswith(prefix):
-        return value[len(prefix):]
-    return value
-
-
+# The functions below are pure and see the same few values repeatedly when
+# scanning many README.chromium files, so their results are cached.
+@functools.lru_cache(maxsize=1024)
 def normalize_value(value: str) -> str:
     """Removes unnecessary prefixes/suffixes.
     """
     # Do not convert to lower case here, as we want to preserve the original
     # casing for warning messages.
-    return _remove_prefix(value, "LicenseRef-").strip()
+    # Strip first too, so that a prefix after a comma separator (e.g. the
+    # " LicenseRef-MIT" in "Apache-2.0, LicenseRef-MIT") is still removed.
+    return value.strip().removeprefix("LicenseRef-").strip()
 
 
-def _license_in_list(value: str, allow_list: frozenset[str]) -> bool:
-    """Normalizes and does a case insensitive check if value is in allow_list.
+def _license_in_list(value: str, allow_list_lc: frozenset[str]) -> bool:
+    """Normalizes and does a case insensitive check if value is in
+    allow_list_lc, which must already be lowercased.
     """
-    return normalize_value(value).lower() in map(str.lower, allow_list)
+    return normalize_value(value).lower() in allow_list_lc
 
 
+@functools.lru_cache(maxsize=1024)
 def is_a_known_license(value: str) -> bool:
-    return _license_in_list(value, _ALL_LICENSES)
+    return is_a_known_normalized_license(normalize_value(value))
+
+
+def is_a_known_normalized_license(value: str) -> bool:
+    """Like is_a_known_license, for a value already passed through
+    normalize_value.
+    """
+    return value.lower() in _ALL_LICENSES_LC
 
 
 def is_allowed_spdx_license(value: str) -> bool:
-    return _license_in_list(value, _ALLOWED_SPDX_LICENSES)
+    return _license_in_list(value, _ALLOWED_SPDX_LICENSES_LC)
 
 
 def is_extended_license_classifier(value: str) -> bool:
-    return _license_in_list(value, _EXTENDED_LICENSE_CLASSIFIERS)
+    return _license_in_list(value, _EXTENDED_LICENSE_CLASSIFIERS_LC)
 
 
+@functools.lru_cache(maxsize=1024)
 def is_allowed_license(value: str) -> bool:
-    return _license_in_list(value, _ALLOWED_LICENSES)
+    return _license_in_list(value, _ALLOWED_LICENSES_LC)
 
 
+@functools.lru_cache(maxsize=1024)
 def is_open_source_license(value: str) -> bool:
-    return _license_in_list(value, _OPEN_SOURCE_SPDX_LICENSES)
+    return _license_in_list(value, _OPEN_SOURCE_SPDX_LICENSES_LC)
 
 
+@functools.lru_cache(maxsize=1024)
 def is_with_permission_only(value: str) -> bool:
-    return _license_in_list(value, _WITH_PERMISSION_ONLY)
+    return _license_in_list(value, _WITH_PERMISSION_ONLY_LC)
 
 
+@functools.lru_cache(maxsize=1024)
 def is_license_allowed(value: str,
                        is_open_source_project: bool = False) -> bool:
     """Returns whether the value is in the allowlist for license
     types.
     """
-    # Restricted licenses are not enforced by presubmits, see b/388620886 😢.
-    if is_with_permission_only(value):
-        return True
-    if is_allowed_license(value):
-        return True
-    if is_open_source_project and is_open_source_license(value):
+    return is_normalized_license_allowed(normalize_value(value),
+                                         is_open_source_project)
+
+
+def is_normalized_license_allowed(value: str,
+                                  is_open_source_project: bool = False) -> bool:
+    """Like is_license_allowed, for a value already passed through
+    normalize_value.
+    """
+    # Restricted licenses are not enforced by presubmits, see b/388620886 😢,
+    # so they are _ALWAYS_ALLOWED too.
+    verdict = _LICENSE_VERDICTS.get(value.lower(), 0)
+    if verdict & _ALWAYS_ALLOWED:
         return True
-    return False
+    return is_open_source_project and bool(verdict & _OPEN_SOURCE_ONLY)
@@ -13,7 +13,8 @@ _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", ".."))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.field_types as field_types
 import metadata.fields.util as util
@@ -99,6 +100,8 @@ class LicenseFileField(field_types.SingleLineTextField):
                 ])
 
         invalid_values = []
+        # Paths already checked, so a file listed twice is only stat-ed once.
+        checked = set()
         for license_filename in value.split(self.VALUE_DELIMITER):
             license_filename = license_filename.strip()
             if license_filename.startswith("/"):
@@ -109,6 +112,10 @@ class LicenseFileField(field_types.SingleLineTextField):
                 license_filepath = os.path.join(
                     source_file_dir, os.path.normpath(license_filename))
 
+            if license_filepath in checked:
+                continue
+            checked.add(license_filepath)
+
             if not os.path.exists(license_filepath):
                 rel_filepath = os.path.relpath(license_filepath, repo_root_dir)
                 invalid_values.append(rel_filepath)
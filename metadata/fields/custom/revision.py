@@ -5,6 +5,7 @@
 
 import os
 import re
+import string
 import sys
 from typing import Optional
 
@@ -13,7 +14,8 @@ _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", ".."))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.field_types as field_types
 import metadata.fields.custom.version as version_field
@@ -22,10 +24,20 @@ import metadata.validation_result as vr
 
 HEX_PATTERN = re.compile(r"^[a-fA-F0-9]{7,40}$")
 
+# Deletes all hexadecimal digits; see `is_hex_revision` below.
+_DELETE_HEX_DIGITS = str.maketrans("", "", string.hexdigits)
+
 # A special pattern to indicate that revision is written in DEPS file.
 DEPS_PATTERN = re.compile(r"^DEPS$")
 
 
+def is_hex_revision(value: str) -> bool:
+    """Returns whether the value is a 7 to 40 character hexadecimal string,
+    i.e. whether it matches HEX_PATTERN.
+    """
+    return 7 <= len(value) <= 40 and not value.translate(_DELETE_HEX_DIGITS)
+
+
 class RevisionField(field_types.SingleLineTextField):
     """Custom field for the revision."""
 
@@ -46,7 +58,7 @@ class RevisionField(field_types.SingleLineTextField):
         if util.is_known_invalid_value(value):
             return None
 
-        if not HEX_PATTERN.match(value):
+        if not is_hex_revision(value):
             return None
 
         return value
@@ -72,7 +84,7 @@ class RevisionField(field_types.SingleLineTextField):
                 ],
             )
 
-        if not HEX_PATTERN.match(value):
+        if not is_hex_revision(value):
             return vr.ValidationError(
                 reason=f"{self._name} is not a valid hexadecimal revision.",
                 additional=[
@@ -3,6 +3,7 @@
 # Use of this source code is governed by a BSD-style license that can be
 # found in the LICENSE file.
 
+import functools
 import re
 from typing import Optional, Tuple
 
@@ -41,15 +42,31 @@ UPDATE_MECHANISM_REGEX = re.compile(
 BUG_LINK_REGEX = re.compile(r"^https://crbug\.com/(\d+)$")
 
 # A set of the fully-qualified, allowed mechanism values.
-ALLOWED_MECHANISMS = {
+ALLOWED_MECHANISMS = frozenset({
     "Autoroll.GoogleManaged",
     "Autoroll",
     "Manual",
     "Static",
     "Static.HardFork",
+})
+
+# The allowed mechanisms, as listed in validation messages.
+_QUOTED_ALLOWED_MECHANISMS = util.quoted(sorted(ALLOWED_MECHANISMS))
+
+# Bug link policies, keyed by primary mechanism. A primary mechanism that is
+# not listed may have a bug link, but does not need one.
+_BUG_LINK_EXPECTED = "expected"
+_BUG_LINK_FORBIDDEN = "forbidden"
+_BUG_LINK_POLICIES = {
+    # If it's not Autorolled, it SHOULD have a bug link.
+    # Only warn for Static, for now.
+    "Static": _BUG_LINK_EXPECTED,
+    # Autoroll must not have a bug link.
+    "Autoroll": _BUG_LINK_FORBIDDEN,
 }
 
 
+@functools.lru_cache(maxsize=256)
 def parse_update_mechanism(
         value: str) -> Tuple[str, Optional[str], Optional[str]]:
     """
@@ -87,7 +104,7 @@ class UpdateMechanismField(field_types.SingleLineTextField):
             return vr.ValidationError(
                 reason=f"{self._name} field cannot be empty.",
                 additional=[
-                    f"Must be one of {util.quoted(sorted(ALLOWED_MECHANISMS))}.",
+                    f"Must be one of {_QUOTED_ALLOWED_MECHANISMS}.",
                     "Example: 'Autoroll' or 'Manual (https://crbug.com/12345)'"
                 ])
 
@@ -98,7 +115,7 @@ class UpdateMechanismField(field_types.SingleLineTextField):
                 reason=f"Invalid format for {self._name} field.",
                 additional=[
                     "Expected format: Mechanism[.SubMechanism] [(bug)]",
-                    f"Allowed mechanisms: {util.quoted(sorted(ALLOWED_MECHANISMS))}.",
+                    f"Allowed mechanisms: {_QUOTED_ALLOWED_MECHANISMS}.",
                     "Example: 'Static.HardFork (https://crbug.com/12345)'",
                 ])
 
@@ -110,12 +127,12 @@ class UpdateMechanismField(field_types.SingleLineTextField):
             return vr.ValidationError(
                 reason=f"{self._name} has invalid mechanism '{mechanism}'.",
                 additional=[
-                    f"Must be one of {util.quoted(sorted(ALLOWED_MECHANISMS))}.",
+                    f"Must be one of {_QUOTED_ALLOWED_MECHANISMS}.",
                 ])
 
-        # If it's not Autorolled, it SHOULD have a bug link.
-        # Only warn for Static, for now.
-        elif primary == "Static" and bug_link is None:
+        # Third, check the bug link against the mechanism's policy.
+        bug_link_policy = _BUG_LINK_POLICIES.get(primary)
+        if bug_link_policy == _BUG_LINK_EXPECTED and bug_link is None:
             return vr.ValidationWarning(
                 reason=f"{self._name} has no link to autoroll exception.",
                 additional=[
@@ -123,8 +140,7 @@ class UpdateMechanismField(field_types.SingleLineTextField):
                     f"Example: '{mechanism} (https://crbug.com/12345)'"
                 ])
 
-        # Autoroll must not have a bug link.
-        if primary == "Autoroll" and bug_link:
+        if bug_link_policy == _BUG_LINK_FORBIDDEN and bug_link:
             return vr.ValidationError(
                 reason="Autoroll does not permit an autoroll exception.",
                 additional=[
@@ -14,7 +14,8 @@ _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", ".."))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.util as util
 import metadata.validation_result as vr
@@ -34,17 +35,20 @@ class MetadataField:
     VALUE_DELIMITER = ","
 
     def __init__(self, name: str, structured: bool = True):
-        self._name = name
+        self._name = sys.intern(name)
+        # Fields are compared case-insensitively, and are used as dict keys
+        # on every metadata entry, so compute the comparison key once.
+        self._key = sys.intern(name.lower())
         self._structured = structured
 
     def __eq__(self, other):
         if not isinstance(other, MetadataField):
             return False
 
-        return self._name.lower() == other._name.lower()
+        return self._key == other._key
 
     def __hash__(self):
-        return hash(self._name.lower())
+        return hash(self._key)
 
     def get_name(self):
         return self._name
@@ -5,61 +5,99 @@
 
 import os
 import sys
+from typing import Iterable, Tuple
 import unittest
 
 _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 # The repo's root directory.
-_ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", ".."))
+_ROOT_DIR = os.path.dirname(os.path.dirname(_THIS_DIR))
+# The directory of test data, used as the metadata's source directory.
+_DATA_DIR = os.path.join(_THIS_DIR, "data")
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.dependency_metadata as dm
 import metadata.fields.known as known_fields
 import metadata.validation_result as vr
 
+# Field names used throughout the tests.
+CPE_PREFIX = known_fields.CPE_PREFIX.get_name()
+LICENSE = known_fields.LICENSE.get_name()
+LICENSE_FILE = known_fields.LICENSE_FILE.get_name()
+MITIGATED = known_fields.MITIGATED.get_name()
+NAME = known_fields.NAME.get_name()
+REVISION = known_fields.REVISION.get_name()
+SECURITY_CRITICAL = known_fields.SECURITY_CRITICAL.get_name()
+SHIPPED = known_fields.SHIPPED.get_name()
+SHIPPED_IN_CHROMIUM = known_fields.SHIPPED_IN_CHROMIUM.get_name()
+UPDATE_MECHANISM = known_fields.UPDATE_MECHANISM.get_name()
+URL = known_fields.URL.get_name()
+VERSION = known_fields.VERSION.get_name()
+
+
+def _add_entries(dependency: dm.DependencyMetadata,
+                 entries: Iterable[Tuple[str, str]]):
+    """Adds each (field_name, field_value) pair to `dependency`."""
+    for field_name, field_value in entries:
+        dependency.add_entry(field_name, field_value)
+
 
 class DependencyValidationTest(unittest.TestCase):
+    # Entries of valid metadata, which tests extend.
+    _BASELINE_ENTRIES = (
+        (NAME, "Test valid metadata"),
+        (URL, "https://www.example.com"),
+        (VERSION, "1.0.0"),
+        (LICENSE, "MIT"),
+        (LICENSE_FILE, "LICENSE"),
+        (SECURITY_CRITICAL, "no"),
+        (SHIPPED, "no"),
+    )
+
+    def _copy_baseline(self) -> dm.DependencyMetadata:
+        """Returns new metadata with the valid baseline entries."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, self._BASELINE_ENTRIES)
+        return dependency
+
+    def _assert_single_result(self, results, result_type, reason: str):
+        """Asserts `results` is exactly one `result_type` with `reason`."""
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], result_type)
+        self.assertEqual(results[0].get_reason(), reason)
+
     def test_repeated_field(self):
         """Check that a validation error is returned for a repeated
         field.
         """
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test repeated field")
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-        dependency.add_entry(known_fields.NAME.get_name(), "again")
+        dependency = self._copy_baseline()
+        dependency.add_entry(NAME, "again")
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
-        self.assertEqual(len(results), 1)
-        self.assertTrue(isinstance(results[0], vr.ValidationError))
-        self.assertEqual(results[0].get_reason(), "There is a repeated field.")
+        self._assert_single_result(results, vr.ValidationError,
+                                   "There is a repeated field.")
 
     def test_only_alias_field(self):
         """Check that an alias field can be used for a main field."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test alias field used")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        # Use Shipped in Chromium instead of Shipped.
-        dependency.add_entry(known_fields.SHIPPED_IN_CHROMIUM.get_name(), "no")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
+        _add_entries(dependency, (
+            (URL, "https://www.example.com"),
+            (NAME, "Test alias field used"),
+            (VERSION, "1.0.0"),
+            (LICENSE_FILE, "LICENSE"),
+            (LICENSE, "MIT"),
+            # Use Shipped in Chromium instead of Shipped.
+            (SHIPPED_IN_CHROMIUM, "no"),
+            (SECURITY_CRITICAL, "no"),
+        ))
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
         self.assertEqual(len(results), 0)
@@ -69,19 +107,19 @@ class DependencyValidationTest(unittest.TestCase):
         field) is still validated.
         """
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test alias field overwrite")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.SHIPPED_IN_CHROMIUM.get_name(), "no")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "test")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
+        _add_entries(dependency, (
+            (URL, "https://www.example.com"),
+            (NAME, "Test alias field overwrite"),
+            (VERSION, "1.0.0"),
+            (LICENSE_FILE, "LICENSE"),
+            (LICENSE, "MIT"),
+            (SHIPPED_IN_CHROMIUM, "no"),
+            (SHIPPED, "test"),
+            (SECURITY_CRITICAL, "no"),
+        ))
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
         self.assertEqual(len(results), 1)
@@ -92,355 +130,332 @@ class DependencyValidationTest(unittest.TestCase):
         to that alias field.
         """
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test alias field error attributed")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.SHIPPED_IN_CHROMIUM.get_name(),
-                             "test")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
+        _add_entries(dependency, (
+            (URL, "https://www.example.com"),
+            (NAME, "Test alias field error attributed"),
+            (VERSION, "1.0.0"),
+            (LICENSE_FILE, "LICENSE"),
+            (LICENSE, "MIT"),
+            (SHIPPED_IN_CHROMIUM, "test"),
+            (SHIPPED, "yes"),
+            (SECURITY_CRITICAL, "no"),
+        ))
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].get_reason(),
                          "Shipped in Chromium is invalid.")
 
-    def test_versioning_field(self):
+    def test_versioning_insufficient(self):
         """Check that a validation error is returned for insufficient
         versioning info."""
-        with self.subTest(msg="Insufficient versioning info"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test metadata missing versioning info")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 1)
-            self.assertTrue(isinstance(results[0], vr.ValidationError))
-            self.assertEqual(results[0].get_reason(),
-                             "Versioning fields are insufficient.")
-
-        with self.subTest(
-                msg="Google Internal URL skips versioning requirement"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test Google Internal URL")
-            dependency.add_entry(known_fields.URL.get_name(), "Google Internal")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "yes")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test metadata missing versioning info"),
+            (URL, "https://www.example.com"),
+            (VERSION, "N/A"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+        ))
 
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 0)
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self._assert_single_result(results, vr.ValidationError,
+                                   "Versioning fields are insufficient.")
+
+    def test_versioning_google_internal_url(self):
+        """Check that a Google Internal URL skips the versioning requirement."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test Google Internal URL"),
+            (URL, "Google Internal"),
+            (VERSION, "N/A"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "yes"),
+            (SHIPPED, "yes"),
+        ))
 
-        with self.subTest(msg="CPEPrefix without version, N/A Version"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(), "Test")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://example.com")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.REVISION.get_name(), "1234abcdef1234")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-            dependency.add_entry(known_fields.CPE_PREFIX.get_name(),
-                                 "cpe:/a:vendor:product")
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR)
-            self.assertEqual(len(results), 1)
-            reasons = {r.get_reason() for r in results}
-            self.assertIn(
-                "CPEPrefix is missing a version, and no Version is specified.",
-                reasons)
-
-        with self.subTest(msg="CPEPrefix without version, with Version"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(), "Test")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://example.com")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-            dependency.add_entry(known_fields.CPE_PREFIX.get_name(),
-                                 "cpe:/a:vendor:product")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0")
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR)
-            self.assertEqual(len(results), 0)
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertEqual(len(results), 0)
 
-        with self.subTest(msg="CPEPrefix with version, N/A Version"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(), "Test")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://example.com")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.REVISION.get_name(), "1234abcdef1234")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-            dependency.add_entry(known_fields.CPE_PREFIX.get_name(),
-                                 "cpe:/a:vendor:product:1.0")
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR)
-            self.assertEqual(len(results), 0)
+    def test_versioning_cpe_without_version_na_version(self):
+        """Check a CPEPrefix without a version and an N/A Version."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test"),
+            (URL, "https://example.com"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (VERSION, "N/A"),
+            (SECURITY_CRITICAL, "no"),
+            (REVISION, "1234abcdef1234"),
+            (SHIPPED, "no"),
+            (CPE_PREFIX, "cpe:/a:vendor:product"),
+        ))
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(
+            results[0].get_reason(),
+            "CPEPrefix is missing a version, and no Version is specified.")
+
+    def test_versioning_cpe_without_version_with_version(self):
+        """Check a CPEPrefix without a version, with a Version."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test"),
+            (URL, "https://example.com"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+            (CPE_PREFIX, "cpe:/a:vendor:product"),
+            (VERSION, "1.0"),
+        ))
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR)
+        self.assertEqual(len(results), 0)
 
-        with self.subTest(msg="CPEPrefix unknown, N/A Version"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(), "Test")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://example.com")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.REVISION.get_name(), "1234abcdef1234")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-            dependency.add_entry(known_fields.CPE_PREFIX.get_name(), "unknown")
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR)
-            self.assertEqual(len(results), 0)
+    def test_versioning_cpe_with_version_na_version(self):
+        """Check a CPEPrefix with a version and an N/A Version."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test"),
+            (URL, "https://example.com"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (VERSION, "N/A"),
+            (REVISION, "1234abcdef1234"),
+            (SHIPPED, "no"),
+            (CPE_PREFIX, "cpe:/a:vendor:product:1.0"),
+        ))
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR)
+        self.assertEqual(len(results), 0)
 
-        with self.subTest(msg="Insufficient versioning with invalid revision"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test metadata missing versioning info")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.REVISION.get_name(), "N/A")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
+    def test_versioning_cpe_unknown_na_version(self):
+        """Check an unknown CPEPrefix and an N/A Version."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test"),
+            (URL, "https://example.com"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (VERSION, "N/A"),
+            (REVISION, "1234abcdef1234"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+            (CPE_PREFIX, "unknown"),
+        ))
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR)
+        self.assertEqual(len(results), 0)
 
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 2)
-            self.assertTrue(isinstance(results[0], vr.ValidationError))
-            self.assertTrue(isinstance(results[1], vr.ValidationError))
-            self.assertEqual(results[0].get_reason(),
-                             "Revision is not a valid hexadecimal revision.")
-            self.assertEqual(results[1].get_reason(),
-                             "Versioning fields are insufficient.")
-
-        with self.subTest(msg="Invalid revision format"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Invalid Revision")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.REVISION.get_name(),
-                                 "invalid_revision")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
+    def test_versioning_insufficient_invalid_revision(self):
+        """Check insufficient versioning info with an invalid revision."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test metadata missing versioning info"),
+            (URL, "https://www.example.com"),
+            (VERSION, "N/A"),
+            (REVISION, "N/A"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+        ))
 
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 1)
-            self.assertTrue(isinstance(results[0], vr.ValidationError))
-            self.assertEqual(
-                results[0].get_reason(),
-                "Revision is not a valid hexadecimal revision.",
-            )
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertEqual(len(results), 2)
+        self.assertIsInstance(results[0], vr.ValidationError)
+        self.assertIsInstance(results[1], vr.ValidationError)
+        self.assertEqual(results[0].get_reason(),
+                         "Revision is not a valid hexadecimal revision.")
+        self.assertEqual(results[1].get_reason(),
+                         "Versioning fields are insufficient.")
+
+    def test_versioning_invalid_revision_format(self):
+        """Check that an invalid revision format is an error."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Invalid Revision"),
+            (URL, "https://www.example.com"),
+            (VERSION, "1.0.0"),
+            (REVISION, "invalid_revision"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+        ))
 
-        with self.subTest(msg="Valid revision format"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(), "Valid Revision")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-
-            # Expect an insufficient versioning error since version is N/A.
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertGreater(len(results), 0)
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self._assert_single_result(
+            results, vr.ValidationError,
+            "Revision is not a valid hexadecimal revision.")
+
+    def test_versioning_valid_revision_format(self):
+        """Check that a valid revision provides versioning info."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Valid Revision"),
+            (URL, "https://www.example.com"),
+            (VERSION, "N/A"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+        ))
+
+        # Expect an insufficient versioning error since version is N/A.
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertGreater(len(results), 0)
 
-            # Fix the error by adding a valid revision.
-            dependency.add_entry(known_fields.REVISION.get_name(), "abcdef1")
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 0)
+        # Fix the error by adding a valid revision.
+        dependency.add_entry(REVISION, "abcdef1")
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertEqual(len(results), 0)
 
-        with self.subTest(msg="Revision: DEPS is acceptable"):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(), "Dependency")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.REVISION.get_name(), "DEPS")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
+    def test_versioning_revision_in_deps(self):
+        """Check that "Revision: DEPS" is acceptable."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Dependency"),
+            (URL, "https://www.example.com"),
+            (VERSION, "N/A"),
+            (REVISION, "DEPS"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+        ))
 
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 0)
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertEqual(len(results), 0)
 
-        with self.subTest(
-                msg=
-                "Check versioning information isn't required for dependencies where"
-                "Chromium is the canonical repository."):
-            dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test valid metadata")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "This is the canonical repository")
-            dependency.add_entry(known_fields.VERSION.get_name(), "N/A")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "yes")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
+    def test_versioning_canonical_repository(self):
+        """Check versioning information isn't required for dependencies
+        where Chromium is the canonical repository."""
+        dependency = dm.DependencyMetadata()
+        _add_entries(dependency, (
+            (NAME, "Test valid metadata"),
+            (URL, "This is the canonical repository"),
+            (VERSION, "N/A"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "yes"),
+            (SHIPPED, "yes"),
+        ))
 
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-            self.assertEqual(len(results), 0)
+        results = dependency.validate(
+            source_file_dir=_DATA_DIR,
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertEqual(len(results), 0)
 
     def test_required_field(self):
         """Check that a validation error is returned for a missing field."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.NAME.get_name(), "Test missing field")
+        _add_entries(dependency, (
+            (SHIPPED, "no"),
+            (SECURITY_CRITICAL, "no"),
+            (LICENSE_FILE, "LICENSE"),
+            (LICENSE, "MIT"),
+            (VERSION, "1.0.0"),
+            (NAME, "Test missing field"),
+        ))
         # Leave URL field unspecified.
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
-        self.assertEqual(len(results), 1)
-        self.assertTrue(isinstance(results[0], vr.ValidationError))
-        self.assertEqual(results[0].get_reason(),
-                         "Required field 'URL' is missing.")
+        self._assert_single_result(results, vr.ValidationError,
+                                   "Required field 'URL' is missing.")
 
     def test_invalid_field(self):
         """Check field validation issues are returned."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.NAME.get_name(), "Test invalid field")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "test")
+        _add_entries(dependency, (
+            (URL, "https://www.example.com"),
+            (NAME, "Test invalid field"),
+            (VERSION, "1.0.0"),
+            (LICENSE_FILE, "LICENSE"),
+            (LICENSE, "MIT"),
+            (SHIPPED, "no"),
+            (SECURITY_CRITICAL, "test"),
+        ))
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
-        self.assertEqual(len(results), 1)
-        self.assertTrue(isinstance(results[0], vr.ValidationError))
-        self.assertEqual(results[0].get_reason(),
-                         "Security Critical is invalid.")
+        self._assert_single_result(results, vr.ValidationError,
+                                   "Security Critical is invalid.")
 
     def test_invalid_license_file_path(self):
         """Check license file path validation issues are returned."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test license file path")
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                             "MISSING-LICENSE")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
+        _add_entries(dependency, (
+            (NAME, "Test license file path"),
+            (URL, "https://www.example.com"),
+            (VERSION, "1.0.0"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "MISSING-LICENSE"),
+            (SECURITY_CRITICAL, "no"),
+            (SHIPPED, "no"),
+        ))
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
-        self.assertEqual(len(results), 1)
-        self.assertTrue(isinstance(results[0], vr.ValidationWarning))
-        self.assertEqual(results[0].get_reason(), "License File is invalid.")
+        self._assert_single_result(results, vr.ValidationWarning,
+                                   "License File is invalid.")
 
     def test_multiple_validation_issues(self):
         """Check all validation issues are returned."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test multiple errors")
+        dependency.add_entry(NAME, "Test multiple errors")
         # Leave URL field unspecified.
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                             "MISSING-LICENSE")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "test")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-        dependency.add_entry(known_fields.NAME.get_name(), "again")
+        _add_entries(dependency, (
+            (VERSION, "1.0.0"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "MISSING-LICENSE"),
+            (SECURITY_CRITICAL, "test"),
+            (SHIPPED, "no"),
+            (NAME, "again"),
+        ))
 
         # Check 4 validation results are returned, for:
         #   - missing field;
@@ -448,106 +463,55 @@ class DependencyValidationTest(unittest.TestCase):
         #   - invalid yes/no field value; and
         #   - repeated field entry.
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
         self.assertEqual(len(results), 4)
 
     def test_valid_metadata(self):
         """Check valid metadata returns no validation issues."""
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test valid metadata")
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
+        dependency = self._copy_baseline()
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
         self.assertEqual(len(results), 0)
 
-    def test_all_licenses_allowlisted(self):
-        """Test that a single allowlisted license returns True."""
-        lic = known_fields.LICENSE
-        self.assertTrue(lic.all_licenses_allowed("MIT", False))
-        self.assertTrue(lic.all_licenses_allowed("MIT, GPL-2.0", False))
-        self.assertTrue(lic.all_licenses_allowed("MIT, Apache-2.0", False))
-        self.assertFalse(lic.all_licenses_allowed("InvalidLicense", False))
-        self.assertFalse(lic.all_licenses_allowed("MIT, InvalidLicense", False))
-        self.assertFalse(lic.all_licenses_allowed("", False))
-
-        # "MPL-2.0" is a reciprocal license, i.e. only allowed in open source projects.
-        self.assertTrue(lic.all_licenses_allowed("MPL-2.0", True))
-        self.assertFalse(lic.all_licenses_allowed("MPL-2.0", False))
-
-        # Restricted licenses are treated the same as other license types, until
-        # the exception and enforcement is resourced.
-        self.assertTrue(lic.all_licenses_allowed("GPL-2.0", False))
-        self.assertTrue(lic.all_licenses_allowed("GPL-2.0", True))
-        self.assertFalse(lic.all_licenses_allowed("MPL-2.0, GPL-2.0", False))
-
-
-    def test_only_open_source_licenses(self):
-        """Test that only open source licenses are returned."""
-        lic = known_fields.LICENSE
-        self.assertEqual(lic.filter_open_source_project_only_licenses(""), [])
-        self.assertEqual(lic.filter_open_source_project_only_licenses("MIT"),
-                         [])
-        self.assertEqual(
-            lic.filter_open_source_project_only_licenses("GPL-2.0"), [])
-        self.assertEqual(
-            lic.filter_open_source_project_only_licenses("MPL-2.0"),
-            ["MPL-2.0"])
-        result = lic.filter_open_source_project_only_licenses("MIT, MPL-2.0")
-        self.assertEqual(result, ["MPL-2.0"])
-        result = lic.filter_open_source_project_only_licenses(
-            "MPL-2.0, APSL-2.0")
-        self.assertEqual(set(result), {"MPL-2.0", "APSL-2.0"})
-        # Test with mix of invalid and valid licenses
-        result = lic.filter_open_source_project_only_licenses(
-            "InvalidLicense, MPL-2.0")
-        self.assertEqual(result, ["MPL-2.0"])
-
     def test_mitigated_validation(self):
         """Tests validation of Mitigated field and corresponding CVE descriptions."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.NAME.get_name(), "Test Dependency")
-        dependency.add_entry(known_fields.URL.get_name(), "http://example.com")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "yes")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
-
-        # Add description for one CVE and an extra one.
-        dependency.add_entry("CVE-2024-1234", "Fixed in this version")
-        dependency.add_entry("CVE-2024-9999", "This shouldn't be here")
+        _add_entries(dependency, (
+            (NAME, "Test Dependency"),
+            (URL, "http://example.com"),
+            (VERSION, "1.0"),
+            (LICENSE, "MIT"),
+            (LICENSE_FILE, "LICENSE"),
+            (SECURITY_CRITICAL, "yes"),
+            (SHIPPED, "yes"),
+            # Add description for one CVE and an extra one.
+            ("CVE-2024-1234", "Fixed in this version"),
+            ("CVE-2024-9999", "This shouldn't be here"),
+        ))
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
         # Check that a warning is returned when only CVE descriptions are
         # present.
         self.assertGreater(len(results), 0)
-        self.assertTrue(isinstance(results[0], vr.ValidationWarning))
+        self.assertIsInstance(results[0], vr.ValidationWarning)
         self.assertEqual(results[0].get_reason(),
                          "Found descriptions for unlisted vulnerability IDs")
         self.assertIn("CVE-2024-1234",results[0].get_additional()[0])
         self.assertIn("CVE-2024-9999",results[0].get_additional()[0])
 
         # Add Mitigated field with two CVEs.
-        dependency.add_entry(known_fields.MITIGATED.get_name(),
-                             "CVE-2024-1234, CVE-2024-5678")
+        dependency.add_entry(MITIGATED, "CVE-2024-1234, CVE-2024-5678")
 
         results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            source_file_dir=_DATA_DIR,
             repo_root_dir=_THIS_DIR,
         )
 
@@ -555,14 +519,14 @@ class DependencyValidationTest(unittest.TestCase):
         # 1. Missing description for CVE-2024-5678
         # 2. Extra description for CVE-2024-9999
         # Separate warnings to test independently of order.
-        missing_desc_warnings = [
-            r for r in results
-            if r.get_reason() == "Missing descriptions for vulnerability IDs"
-        ]
-        extra_desc_warnings = [
-            r for r in results if r.get_reason() ==
-            "Found descriptions for unlisted vulnerability IDs"
-        ]
+        missing_desc_warnings = []
+        extra_desc_warnings = []
+        for r in results:
+            reason = r.get_reason()
+            if reason == "Missing descriptions for vulnerability IDs":
+                missing_desc_warnings.append(r)
+            elif reason == "Found descriptions for unlisted vulnerability IDs":
+                extra_desc_warnings.append(r)
 
         self.assertEqual(len(missing_desc_warnings), 1)
         self.assertIn("CVE-2024-5678",
@@ -575,359 +539,339 @@ class DependencyValidationTest(unittest.TestCase):
 
     def test_vuln_scan_sufficiency(self):
         """Tests the vuln_scan_sufficiency property."""
-        # Test case: insufficient CPE without version.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.CPE_PREFIX.get_name(),
-                             "cpe:/a:vendor:product")
-        self.assertEqual(dependency.vuln_scan_sufficiency, "insufficient")
-
-        # Test case: sufficient:CPE.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.CPE_PREFIX.get_name(),
-                             "cpe:/a:vendor:product")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.2.3")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "sufficient:CPE")
-
-        # Test case: insufficient URL and Revision if url is not clonable.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://not_clonable.com")
-        dependency.add_entry(known_fields.REVISION.get_name(), "abcdef123456")
-        self.assertEqual(dependency.vuln_scan_sufficiency, "insufficient")
-
-        # Test case: sufficient:URL and Revision, url must be git clonable.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://git.clonable.com")
-        dependency.add_entry(known_fields.REVISION.get_name(), "abcdef123456")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "sufficient:URL and Revision")
-
-        # Test case: sufficient:URL and Revision[DEPS], given 'Revision:DEPS'.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(), "https://example.com")
-        dependency.add_entry(known_fields.REVISION.get_name(), "DEPS")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "sufficient:URL and Revision[DEPS]")
-
-        # A generic URL and Version is insufficient.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(), "https://example.com")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.2.3")
-        self.assertEqual(dependency.vuln_scan_sufficiency, "insufficient")
-
-        # Git URL and Version.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://git.example.com/repo.git")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.2.3")
-        self.assertEqual(dependency.vuln_scan_sufficiency, "insufficient")
-
-        # Package Manager URL and Version.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.npmjs.com/package/react")
-        dependency.add_entry(known_fields.VERSION.get_name(), "18.2.0")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "sufficient:Package Manager URL and Version")
-
-        # Test case: insufficient package manager URL with no package name.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://crates.io/crates/")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        self.assertEqual(dependency.vuln_scan_sufficiency, "insufficient")
-
-        # Test case: ignore:Static (because of update mechanism).
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.UPDATE_MECHANISM.get_name(), "Static")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "ignore:Static")
-
-        # Test case: ignore:GoogleManaged (because of update mechanism).
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.UPDATE_MECHANISM.get_name(),
-                             "Autoroll.GoogleManaged")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "ignore:GoogleManaged")
-
-        # Test case: ignore:Canonical (only URL).
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(), "This is the canonical public repository")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "ignore:Canonical")
-
-        # Test case: ignore:Internal (only URL).
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(), "Google internal")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "ignore:Internal")
-
-        # Test case: ignore:Internal takes precedence over ignore:Static.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(), "Google Internal.")
-        dependency.add_entry(known_fields.UPDATE_MECHANISM.get_name(), "Static.HardFork")
-        self.assertEqual(dependency.vuln_scan_sufficiency, "ignore:Internal")
+        # Each case is (description, entries, expected sufficiency).
+        test_cases = (
+            (
+                "insufficient CPE without version",
+                ((CPE_PREFIX, "cpe:/a:vendor:product"), ),
+                "insufficient",
+            ),
+            (
+                "sufficient:CPE",
+                (
+                    (CPE_PREFIX, "cpe:/a:vendor:product"),
+                    (VERSION, "1.2.3"),
+                ),
+                "sufficient:CPE",
+            ),
+            (
+                "insufficient URL and Revision if url is not clonable",
+                (
+                    (URL, "https://not_clonable.com"),
+                    (REVISION, "abcdef123456"),
+                ),
+                "insufficient",
+            ),
+            (
+                "sufficient:URL and Revision, url must be git clonable",
+                (
+                    (URL, "https://git.clonable.com"),
+                    (REVISION, "abcdef123456"),
+                ),
+                "sufficient:URL and Revision",
+            ),
+            (
+                "sufficient:URL and Revision[DEPS], given 'Revision:DEPS'",
+                (
+                    (URL, "https://example.com"),
+                    (REVISION, "DEPS"),
+                ),
+                "sufficient:URL and Revision[DEPS]",
+            ),
+            (
+                "A generic URL and Version is insufficient",
+                (
+                    (URL, "https://example.com"),
+                    (VERSION, "1.2.3"),
+                ),
+                "insufficient",
+            ),
+            (
+                "Git URL and Version",
+                (
+                    (URL, "https://git.example.com/repo.git"),
+                    (VERSION, "1.2.3"),
+                ),
+                "insufficient",
+            ),
+            (
+                "Package Manager URL and Version",
+                (
+                    (URL, "https://www.npmjs.com/package/react"),
+                    (VERSION, "18.2.0"),
+                ),
+                "sufficient:Package Manager URL and Version",
+            ),
+            (
+                "insufficient package manager URL with no package name",
+                (
+                    (URL, "https://crates.io/crates/"),
+                    (VERSION, "1.0.0"),
+                ),
+                "insufficient",
+            ),
+            (
+                "ignore:Static (because of update mechanism)",
+                ((UPDATE_MECHANISM, "Static"), ),
+                "ignore:Static",
+            ),
+            (
+                "ignore:GoogleManaged (because of update mechanism)",
+                ((UPDATE_MECHANISM, "Autoroll.GoogleManaged"), ),
+                "ignore:GoogleManaged",
+            ),
+            (
+                "ignore:Canonical (only URL)",
+                ((URL, "This is the canonical public repository"), ),
+                "ignore:Canonical",
+            ),
+            (
+                "ignore:Internal (only URL)",
+                ((URL, "Google internal"), ),
+                "ignore:Internal",
+            ),
+            (
+                "ignore:Internal takes precedence over ignore:Static",
+                (
+                    (URL, "Google Internal."),
+                    (UPDATE_MECHANISM, "Static.HardFork"),
+                ),
+                "ignore:Internal",
+            ),
+            (
+                "insufficient (bad bug link)",
+                ((UPDATE_MECHANISM, "Manual (bad_bug_link)"), ),
+                "insufficient",
+            ),
+            (
+                "insufficient (no relevant fields, shipped defaults to None)",
+                (),
+                "insufficient",
+            ),
+            (
+                "insufficient (only URL)",
+                ((URL, "https://example.com"), ),
+                "insufficient",
+            ),
+            (
+                "CPE takes precedence over URL/Revision",
+                (
+                    (CPE_PREFIX, "cpe:/a:vendor:product"),
+                    (URL, "https://example.com"),
+                    (REVISION, "abcdef123456"),
+                    (VERSION, "1.2.3"),
+                ),
+                "sufficient:CPE",
+            ),
+            (
+                "URL/Revision takes precedence over static update mechanism",
+                (
+                    (UPDATE_MECHANISM, "Static"),
+                    (URL, "https://example.com.git"),
+                    (REVISION, "abcdef123456"),
+                ),
+                "sufficient:URL and Revision",
+            ),
+        )
+        for msg, entries, expected in test_cases:
+            with self.subTest(msg=msg):
+                dependency = dm.DependencyMetadata()
+                _add_entries(dependency, entries)
+                self.assertEqual(dependency.vuln_scan_sufficiency, expected)
 
-        # Test case: insufficient (bad bug link).
+    def test_vuln_scan_sufficiency_after_add_entry(self):
+        """Check vuln_scan_sufficiency reflects entries added after a read."""
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.UPDATE_MECHANISM.get_name(), "Manual (bad_bug_link)")
+        dependency.add_entry(CPE_PREFIX, "cpe:/a:vendor:product")
         self.assertEqual(dependency.vuln_scan_sufficiency, "insufficient")
 
-        # Test case: insufficient (no relevant fields, shipped defaults to None).
-        dependency = dm.DependencyMetadata()
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                          "insufficient")
-
-        # Test case: insufficient (only URL).
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(), "https://example.com")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "insufficient")
-
-        # Test case: CPE takes precedence over URL/Revision.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.CPE_PREFIX.get_name(),
-                             "cpe:/a:vendor:product")
-        dependency.add_entry(known_fields.URL.get_name(), "https://example.com")
-        dependency.add_entry(known_fields.REVISION.get_name(), "abcdef123456")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.2.3")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "sufficient:CPE")
-
-        # Test case: URL/Revision takes precedence over static update mechanism.
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.UPDATE_MECHANISM.get_name(), "Static")
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://example.com.git")
-        dependency.add_entry(known_fields.REVISION.get_name(), "abcdef123456")
-        self.assertEqual(dependency.vuln_scan_sufficiency,
-                         "sufficient:URL and Revision")
+        dependency.add_entry(VERSION, "1.2.3")
+        self.assertEqual(dependency.vuln_scan_sufficiency, "sufficient:CPE")
 
     def test_vuln_scan_sufficiency_validation(self):
         """Tests that a warning is returned for insufficient metadata."""
         with self.subTest(msg="Insufficient metadata, should warn"):
             dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test insufficency")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "yes")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
+            _add_entries(dependency, (
+                (NAME, "Test insufficency"),
+                (URL, "https://www.example.com"),
+                (VERSION, "1.0.0"),
+                (LICENSE, "MIT"),
+                (LICENSE_FILE, "LICENSE"),
+                (SECURITY_CRITICAL, "yes"),
+                (SHIPPED, "yes"),
+            ))
 
             results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
+                source_file_dir=_DATA_DIR,
                 repo_root_dir=_THIS_DIR,
             )
-            self.assertEqual(len(results), 1)
-            self.assertTrue(isinstance(results[0], vr.ValidationWarning))
-            self.assertEqual(
-                results[0].get_reason(),
+            self._assert_single_result(
+                results, vr.ValidationWarning,
                 "Dependency metadata is insufficient for vulnerability scanning."
             )
 
         with self.subTest(msg="Sufficient metadata, should not warn"):
             dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test sufficency")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://github.com/example/repo.git")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.REVISION.get_name(), "abcdef1234")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "yes")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
+            _add_entries(dependency, (
+                (NAME, "Test sufficency"),
+                (URL, "https://github.com/example/repo.git"),
+                (VERSION, "1.0.0"),
+                (REVISION, "abcdef1234"),
+                (LICENSE, "MIT"),
+                (LICENSE_FILE, "LICENSE"),
+                (SECURITY_CRITICAL, "yes"),
+                (SHIPPED, "yes"),
+            ))
 
             results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
+                source_file_dir=_DATA_DIR,
                 repo_root_dir=_THIS_DIR,
             )
             self.assertEqual(len(results), 0)
 
         with self.subTest(msg="Insufficient metadata, not security critical"):
             dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test insufficency")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
+            _add_entries(dependency, (
+                (NAME, "Test insufficency"),
+                (URL, "https://www.example.com"),
+                (VERSION, "1.0.0"),
+                (LICENSE, "MIT"),
+                (LICENSE_FILE, "LICENSE"),
+                (SECURITY_CRITICAL, "no"),
+                (SHIPPED, "yes"),
+            ))
 
             results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
+                source_file_dir=_DATA_DIR,
                 repo_root_dir=_THIS_DIR,
             )
             self.assertEqual(len(results), 0)
 
         with self.subTest(msg="Insufficient metadata, not shipped"):
             dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test insufficency")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "yes")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
+            _add_entries(dependency, (
+                (NAME, "Test insufficency"),
+                (URL, "https://www.example.com"),
+                (VERSION, "1.0.0"),
+                (LICENSE, "MIT"),
+                (LICENSE_FILE, "LICENSE"),
+                (SECURITY_CRITICAL, "yes"),
+                (SHIPPED, "no"),
+            ))
 
             results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
+                source_file_dir=_DATA_DIR,
                 repo_root_dir=_THIS_DIR,
             )
             self.assertEqual(len(results), 0)
 
         with self.subTest(msg="Insufficient metadata, has update mechanism"):
             dependency = dm.DependencyMetadata()
-            dependency.add_entry(known_fields.NAME.get_name(),
-                                 "Test insufficency")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.github.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.REVISION.get_name(), "abcdef1234")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "yes")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "yes")
-            dependency.add_entry(known_fields.UPDATE_MECHANISM.get_name(),
-                                 "Autoroll")
+            _add_entries(dependency, (
+                (NAME, "Test insufficency"),
+                (URL, "https://www.github.com"),
+                (VERSION, "1.0.0"),
+                (REVISION, "abcdef1234"),
+                (LICENSE, "MIT"),
+                (LICENSE_FILE, "LICENSE"),
+                (SECURITY_CRITICAL, "yes"),
+                (SHIPPED, "yes"),
+                (UPDATE_MECHANISM, "Autoroll"),
+            ))
 
             results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
+                source_file_dir=_DATA_DIR,
                 repo_root_dir=_THIS_DIR,
             )
             self.assertEqual(len(results), 0)
 
-
-def test_update_mechanism_validation(self):
-    """Tests the validation logic for the Update Mechanism field."""
-    # A list of test cases with the value to test and the expected error, if any.
-    test_cases = {
-        # --- Valid Cases ---
-        "Valid Autoroll": ("Autoroll", None),
-        "Valid Manual": ("Manual (crbug.com/123)", None),
-        "Valid Static": ("Static (crbug.com/456)", None),
-        "Valid Static.HardFork": ("Static.HardFork (crbug.com/789)", None),
-        "Valid with extra whitespace": ("  Manual (crbug.com/123)  ", None),
-
-        # --- Invalid Cases ---
-        "Invalid format":
-        ("Invalid Value", "Invalid format for Update Mechanism field."),
-        "Unknown mechanism":
-        ("Custom (crbug.com/123)", "Invalid mechanism 'Custom'."),
-        "Autoroll with bug link": ("Autoroll (crbug.com/123)",
-                                   "A bug link is not allowed for 'Autoroll'."),
-        "Manual without bug link":
-        ("Manual", "A bug link is required for 'Manual'."),
-        "Static without bug link": ("Static",
-                                    "A bug link is required for 'Static'."),
-        "Static.HardFork without bug link":
-        ("Static.HardFork", "A bug link is required for 'Static.HardFork'."),
-    }
-
-    for name, (value, expected_error) in test_cases.items():
-        with self.subTest(msg=name):
-            dependency = dm.DependencyMetadata()
-            # Populate with other valid, required fields to isolate the test
-            dependency.add_entry(known_fields.NAME.get_name(), f"Test {name}")
-            dependency.add_entry(known_fields.URL.get_name(),
-                                 "https://www.example.com")
-            dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-            dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-            dependency.add_entry(known_fields.LICENSE_FILE.get_name(),
-                                 "LICENSE")
-            dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(),
-                                 "no")
-            dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-
-            # Add the Update Mechanism field to test
-            dependency.add_entry("Update Mechanism", value)
-
-            results = dependency.validate(
-                source_file_dir=os.path.join(_THIS_DIR, "data"),
-                repo_root_dir=_THIS_DIR,
-            )
-
-            if expected_error is None:
-                self.assertEqual(len(results), 0,
-                                 f"Expected no errors for value: '{value}'")
-            else:
-                self.assertEqual(len(results), 1,
-                                 f"Expected one error for value: '{value}'")
-                self.assertTrue(isinstance(results[0], vr.ValidationError))
-                self.assertEqual(results[0].get_reason(), expected_error)
-
-    # Test case for a missing Update Mechanism field, assuming it's required.
-    with self.subTest(msg="Missing field"):
-        dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.NAME.get_name(),
-                             "Test Missing Update Mechanism")
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.example.com")
-        dependency.add_entry(known_fields.VERSION.get_name(), "1.0.0")
-        dependency.add_entry(known_fields.LICENSE.get_name(), "MIT")
-        dependency.add_entry(known_fields.LICENSE_FILE.get_name(), "LICENSE")
-        dependency.add_entry(known_fields.SECURITY_CRITICAL.get_name(), "no")
-        dependency.add_entry(known_fields.SHIPPED.get_name(), "no")
-        # The "Update Mechanism" field is omitted.
-
-        results = dependency.validate(
-            source_file_dir=os.path.join(_THIS_DIR, "data"),
-            repo_root_dir=_THIS_DIR,
-        )
-
-        # Assuming 'Update Mechanism' is now a required field in your known_fields config.
-        # If so, the validation framework should catch its absence.
-        error_found = any(
-            "Required field 'Update Mechanism' is missing." in r.get_reason()
-            for r in results)
-        self.assertTrue(
-            error_found,
-            "Expected an error for missing Update Mechanism field.")
+    def test_update_mechanism_validation(self):
+        """Tests the validation logic for the Update Mechanism field."""
+        # Maps each case to the value to test (None to omit the field) and
+        # the expected result type and reason, if any.
+        test_cases = {
+            # --- Valid Cases ---
+            "Missing field": (None, None, None),
+            "Valid Autoroll": ("Autoroll", None, None),
+            "Valid Manual": ("Manual (https://crbug.com/123)", None, None),
+            "Valid Manual without bug link": ("Manual", None, None),
+            "Valid Static": ("Static (https://crbug.com/456)", None, None),
+            "Valid Static.HardFork": ("Static.HardFork (https://crbug.com/789)",
+                                      None, None),
+            "Valid with extra whitespace":
+            ("  Manual (https://crbug.com/123)  ", None, None),
+
+            # --- Invalid Cases ---
+            "Invalid format": ("Invalid Value", vr.ValidationError,
+                               "Invalid format for Update Mechanism field."),
+            "Unknown mechanism":
+            ("Custom (https://crbug.com/123)", vr.ValidationError,
+             "Update Mechanism has invalid mechanism 'Custom'."),
+            "Autoroll with bug link":
+            ("Autoroll (https://crbug.com/123)", vr.ValidationError,
+             "Autoroll does not permit an autoroll exception."),
+            "Bug link without scheme": ("Manual (crbug.com/123)",
+                                        vr.ValidationError,
+                                        "Update Mechanism bug link should be "
+                                        "`(https://crbug.com/123)`."),
+            "Static without bug link":
+            ("Static", vr.ValidationWarning,
+             "Update Mechanism has no link to autoroll exception."),
+            "Static.HardFork without bug link":
+            ("Static.HardFork", vr.ValidationWarning,
+             "Update Mechanism has no link to autoroll exception."),
+        }
+
+        for name, (value, result_type, reason) in test_cases.items():
+            with self.subTest(msg=name):
+                dependency = dm.DependencyMetadata()
+                # Populate with other valid, required fields to isolate the
+                # test.
+                _add_entries(dependency, (
+                    (NAME, f"Test {name}"),
+                    (URL, "https://www.example.com"),
+                    (VERSION, "1.0.0"),
+                    (LICENSE, "MIT"),
+                    (LICENSE_FILE, "LICENSE"),
+                    (SECURITY_CRITICAL, "no"),
+                    (SHIPPED, "no"),
+                ))
+                if value is not None:
+                    dependency.add_entry(UPDATE_MECHANISM, value)
+
+                results = dependency.validate(
+                    source_file_dir=_DATA_DIR,
+                    repo_root_dir=_THIS_DIR,
+                )
+
+                if result_type is None:
+                    self.assertEqual(len(results), 0)
+                else:
+                    self._assert_single_result(results, result_type, reason)
 
     def test_url_is_package_manager(self):
         """Tests the url_is_package_manager property."""
         # Test case: valid package manager URL.
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://www.npmjs.com/package/react")
+        dependency.add_entry(URL, "https://www.npmjs.com/package/react")
         self.assertTrue(dependency.url_is_package_manager)
 
         # Test case: valid package manager URL with trailing slash.
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://crates.io/crates/serde/")
+        dependency.add_entry(URL, "https://crates.io/crates/serde/")
         self.assertTrue(dependency.url_is_package_manager)
 
         # Test case: invalid package manager URL with no package name.
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://crates.io/crates/")
+        dependency.add_entry(URL, "https://crates.io/crates/")
         self.assertFalse(dependency.url_is_package_manager)
 
         # Test case: non-package manager URL.
         dependency = dm.DependencyMetadata()
-        dependency.add_entry(known_fields.URL.get_name(),
-                             "https://example.com")
+        dependency.add_entry(URL, "https://example.com")
         self.assertFalse(dependency.url_is_package_manager)
 
+
 if __name__ == "__main__":
     unittest.main()
@@ -13,7 +13,8 @@ _THIS_DIR = os.path.abspath(os.path.dirname(__file__))
 _ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", ".."))
 
 # Add the repo's root directory for clearer imports.
-sys.path.insert(0, _ROOT_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 import metadata.fields.known as known_fields
 import metadata.fields.field_types as field_types
@@ -155,6 +156,7 @@ class FieldValidationTest(unittest.TestCase):
                 "Refer to additional_readme_paths.json",
                 "LicenseRef-MIT",
                 "LicenseRef-MIT, Apache-2.0",
+                "Apache-2.0, LicenseRef-MIT",
             ],
             error_values=[
                 "",
@@ -209,6 +211,17 @@ class FieldValidationTest(unittest.TestCase):
         )
         self.assertIsInstance(result, vr.ValidationWarning)
 
+        # Check a missing file listed twice is only reported once.
+        result = known_fields.LICENSE_FILE.validate_on_disk(
+            value="MISSING_LICENSE, MISSING_LICENSE",
+            source_file_dir=os.path.join(_THIS_DIR, "data"),
+            repo_root_dir=_THIS_DIR,
+        )
+        self.assertIsInstance(result, vr.ValidationWarning)
+        missing = os.path.join("data", "MISSING_LICENSE")
+        self.assertEqual(result.get_additional()[-1],
+                         f"Missing files: {missing}.")
+
         # Check deprecated NOT_SHIPPED.
         result = known_fields.LICENSE_FILE.validate_on_disk(
             value="NOT_SHIPPED",
@@ -217,6 +230,24 @@ class FieldValidationTest(unittest.TestCase):
         )
         self.assertIsInstance(result, vr.ValidationWarning)
 
+    def test_revision_validation(self):
+        self._run_field_validation(
+            field=known_fields.REVISION,
+            valid_values=[
+                "DEPS",
+                "abcdef1",
+                "1234ABCDEF1234",
+                "a" * 40,
+            ],
+            error_values=[
+                "abcdef",
+                "a" * 41,
+                "invalid_revision",
+                "abcdefg",
+            ],
+            warning_values=["unknown"],
+        )
+
     def test_url_validation(self):
         self._run_field_validation(
             field=known_fields.URL,
@@ -304,6 +335,7 @@ class FieldValidationTest(unittest.TestCase):
             valid_values=[
                 "Autoroll",
                 "  Autoroll  ",
+                "Manual",
                 "Manual (https://crbug.com/12345)",
                 "Static (https://crbug.com/54321)",
                 "Static.HardFork (https://crbug.com/98765)",
@@ -314,6 +346,7 @@ class FieldValidationTest(unittest.TestCase):
                 "Invalid Value",
                 "Custom (crbug.com/123)",
                 "Custom (https://crbug.com/123)",
+                "Autoroll (https://crbug.com/123)",
                 "Manual (https://crbug.com/12345 )",
                 "Manual (https://crbug.com/12345a)",
                 "Manual (crbug.com/12345)",
@@ -0,0 +1,69 @@
+#!/usr/bin/env vpython3
+# Copyright (c) 2026 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+import os
+import sys
+import unittest
+
+_THIS_DIR = os.path.abspath(os.path.dirname(__file__))
+# The repo's root directory.
+_ROOT_DIR = os.path.abspath(os.path.join(_THIS_DIR, "..", ".."))
+
+# Add the repo's root directory for clearer imports.
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+import metadata.fields.known as known_fields
+
+
+class LicenseFieldTest(unittest.TestCase):
+    def test_all_licenses_allowlisted(self):
+        """Test that a single allowlisted license returns True."""
+        lic = known_fields.LICENSE
+        self.assertTrue(lic.all_licenses_allowed("MIT", False))
+        self.assertTrue(lic.all_licenses_allowed("MIT, GPL-2.0", False))
+        self.assertTrue(lic.all_licenses_allowed("MIT, Apache-2.0", False))
+        self.assertFalse(lic.all_licenses_allowed("InvalidLicense", False))
+        self.assertFalse(lic.all_licenses_allowed("MIT, InvalidLicense", False))
+        self.assertFalse(lic.all_licenses_allowed("", False))
+        # The LicenseRef- prefix is removed from every license, not just the
+        # first one.
+        self.assertTrue(
+            lic.all_licenses_allowed("Apache-2.0, LicenseRef-MIT", False))
+
+        # "MPL-2.0" is a reciprocal license, i.e. only allowed in open source projects.
+        self.assertTrue(lic.all_licenses_allowed("MPL-2.0", True))
+        self.assertFalse(lic.all_licenses_allowed("MPL-2.0", False))
+
+        # Restricted licenses are treated the same as other license types, until
+        # the exception and enforcement is resourced.
+        self.assertTrue(lic.all_licenses_allowed("GPL-2.0", False))
+        self.assertTrue(lic.all_licenses_allowed("GPL-2.0", True))
+        self.assertFalse(lic.all_licenses_allowed("MPL-2.0, GPL-2.0", False))
+
+    def test_only_open_source_licenses(self):
+        """Test that only open source licenses are returned."""
+        lic = known_fields.LICENSE
+        self.assertEqual(lic.filter_open_source_project_only_licenses(""), [])
+        self.assertEqual(lic.filter_open_source_project_only_licenses("MIT"),
+                         [])
+        self.assertEqual(
+            lic.filter_open_source_project_only_licenses("GPL-2.0"), [])
+        self.assertEqual(
+            lic.filter_open_source_project_only_licenses("MPL-2.0"),
+            ["MPL-2.0"])
+        result = lic.filter_open_source_project_only_licenses("MIT, MPL-2.0")
+        self.assertEqual(result, ["MPL-2.0"])
+        result = lic.filter_open_source_project_only_licenses(
+            "MPL-2.0, APSL-2.0")
+        self.assertEqual(set(result), {"MPL-2.0", "APSL-2.0"})
+        # Test with mix of invalid and valid licenses
+        result = lic.filter_open_source_project_only_licenses(
+            "InvalidLicense, MPL-2.0")
+        self.assertEqual(result, ["MPL-2.0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,8 @@ _CHROMIUM_METADATA_POSTSCRIPT = ("Check //third_party/README.chromium.template "
 
 class ValidationResult:
     """Base class for validation issues."""
+    __slots__ = ("_reason", "_fatal", "_additional", "_tags", "_lines")
+
     def __init__(self, reason: str, fatal: bool, additional: List[str] = []):
         """Constructor for a validation issue.
 
@@ -108,11 +110,15 @@ class ValidationResult:
 
 class ValidationError(ValidationResult):
     """Fatal validation issue. Presubmit should fail."""
+    __slots__ = ()
+
     def __init__(self, reason: str, additional: List[str] = []):
         super().__init__(reason=reason, fatal=True, additional=additional)
 
 
 class ValidationWarning(ValidationResult):
     """Non-fatal validation issue. Presubmit should pass."""
+    __slots__ = ()
+
     def __init__(self, reason: str, additional: List[str] = []):
         super().__init__(reason=reason, fatal=False, additional=additional)
@@ -6,13 +6,32 @@ from __future__ import annotations
 
 import collections
 import collections.abc
+import functools
 import hashlib
 import json
-import struct
 import typing
 
 from recipe_engine import recipe_test_api
 
+# Prefixes of revisions that are refs, which get generated revisions.
+_REF_PREFIXES = ('refs/', 'origin/')
+
+# The output of a simulated failure to apply a patch.
+_FAILED_PATCH_BODY = '\n'.join([
+    'Downloading patch...',
+    'Applying the patch...',
+    'Patch: foo/bar.py',
+    'Index: foo/bar.py',
+    'diff --git a/foo/bar.py b/foo/bar.py',
+    'index HASH..HASH MODE',
+    '--- a/foo/bar.py',
+    '+++ b/foo/bar.py',
+    'context',
+    '+something',
+    '-something',
+    'more context',
+])
+
 
 class BotUpdateTestApi(recipe_test_api.RecipeTestApi):
 
@@ -135,15 +154,25 @@ class BotUpdateTestApi(recipe_test_api.RecipeTestApi):
       # test data
       got_revision_mapping = got_revision_mapping or {'got_revision': first_sln}
 
+      # resolve_revision is called repeatedly for the same pairs, e.g. twice
+      # per project by will_generate, so remember its results.
+      resolved_cache = {}
+
       def resolve_revision(project_name, revision):
-        if revision == 'HEAD':
-          return self.gen_revision(project_name)
-        if revision.startswith('refs/') or revision.startswith('origin/'):
-          return self.gen_revision('{}@{}'.format(project_name, revision))
-        return revision
+        key = (project_name, revision)
+        resolved = resolved_cache.get(key)
+        if resolved is None:
+          if revision == 'HEAD':
+            resolved = self.gen_revision(project_name)
+          elif revision.startswith(_REF_PREFIXES):
+            resolved = self.gen_revision('{}@{}'.format(project_name, revision))
+          else:
+            resolved = revision
+          resolved_cache[key] = resolved
+        return resolved
 
       def choose_revision(project_name):
-        fixed_revision = (fixed_revisions or {}).get(project_name)
+        fixed_revision = fixed_revisions.get(project_name)
         assert fixed_revision is None or fixed_revision, (
             f'empty fixed_revision provided for {project_name}')
         revision = revisions.get(project_name)
@@ -208,30 +237,28 @@ class BotUpdateTestApi(recipe_test_api.RecipeTestApi):
         return repo_urls.setdefault(project_name,
                                     f'https://fake.org/{project_name}.git')
 
-      output.update({
-          'manifest': {
-              project_name: {
-                  'repository': get_repo_url(project_name),
-                  'revision': revision,
-              }
-              for project_name, revision in sorted(resolved_revisions.items())
-          }
-      })
+      manifest = {}
+      source_manifest_directories = {}
+      for project_name in sorted(resolved_revisions):
+        revision = resolved_revisions[project_name]
+        repo_url = get_repo_url(project_name)
+        manifest[project_name] = {
+            'repository': repo_url,
+            'revision': revision,
+        }
+        source_manifest_directories[project_name] = {
+            'git_checkout': {
+                'repo_url': repo_url,
+                'revision': revision
+            }
+        }
 
       output.update({
+          'manifest': manifest,
           'source_manifest': {
               'version': 0,
-              'directories': {
-                  project_name: {
-                      'git_checkout': {
-                          'repo_url': get_repo_url(project_name),
-                          'revision': revision
-                      }
-                  }
-                  for project_name, revision in sorted(
-                      resolved_revisions.items())
-              }
-          }
+              'directories': source_manifest_directories,
+          },
       })
 
       if fixed_revisions:
@@ -239,20 +266,7 @@ class BotUpdateTestApi(recipe_test_api.RecipeTestApi):
 
       if patch_root and fail_patch:
         output['patch_failure'] = True
-        output['failed_patch_body'] = '\n'.join([
-            'Downloading patch...',
-            'Applying the patch...',
-            'Patch: foo/bar.py',
-            'Index: foo/bar.py',
-            'diff --git a/foo/bar.py b/foo/bar.py',
-            'index HASH..HASH MODE',
-            '--- a/foo/bar.py',
-            '+++ b/foo/bar.py',
-            'context',
-            '+something',
-            '-something',
-            'more context',
-        ])
+        output['failed_patch_body'] = _FAILED_PATCH_BODY
         output['patch_apply_return_code'] = 1
         if fail_patch == 'download':
           output['patch_apply_return_code'] = 3
@@ -263,16 +277,18 @@ class BotUpdateTestApi(recipe_test_api.RecipeTestApi):
     return t + self.m.json.output(output)
 
   @staticmethod
+  @functools.lru_cache(maxsize=None)
   def gen_revision(project):
     """Hash project to bogus deterministic git hash values."""
     h = hashlib.sha1(project.encode('utf-8'))
     return h.hexdigest()
 
   @staticmethod
+  @functools.lru_cache(maxsize=None)
   def gen_commit_position(project):
     """Hash project to bogus deterministic Cr-Commit-Position values."""
     h = hashlib.sha1(project.encode('utf-8'))
-    return struct.unpack('!I', h.digest()[:4])[0] % 300000
+    return int.from_bytes(h.digest()[:4], 'big') % 300000
 
   def post_check_output_json(self, step_name: str, custom_check_fn):
     """Perform a post check on the output json of a bot_update step.
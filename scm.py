@@ -269,10 +269,14 @@ class CachedGitConfigState(object):
         """
         return self.GetConfig(key) == 'true'
 
-    def GetConfigList(self, key: str) -> list[str]:
-        """Returns all values of `key` as a list of strings."""
+    def GetConfigList(self, key: str, scope: Optional[str] = None) -> list[str]:
+        """Returns all values of `key` as a list of strings.
+
+        If `scope` is given, only values from that scope are returned.
+        """
         key = canonicalize_git_config_key(key)
-        return list(self._maybe_load_config().get('default', {}).get(key, ()))
+        return list(self._maybe_load_config().get(scope or 'default',
+                                                  {}).get(key, ()))
 
     def YieldConfigRegexp(self,
                           pattern: Optional[str] = None
@@ -771,9 +775,14 @@ class GIT(object):
         return GIT._get_config_state(cwd).GetConfigBool(key)
 
     @staticmethod
-    def GetConfigList(cwd: str, key: str) -> list[str]:
-        """Returns all values of `key` as a list of strings."""
-        return GIT._get_config_state(cwd).GetConfigList(key)
+    def GetConfigList(cwd: str,
+                      key: str,
+                      scope: Optional[str] = None) -> list[str]:
+        """Returns all values of `key` as a list of strings.
+
+        If `scope` is given, only values from that scope are returned.
+        """
+        return GIT._get_config_state(cwd).GetConfigList(key, scope)
 
     @staticmethod
     def YieldConfigRegexp(
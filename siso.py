@@ -8,7 +8,7 @@ binary when run inside a gclient source tree, so users can just type
 "siso" on the command line."""
 from __future__ import annotations
 
-import argparse
+import functools
 import os
 import platform
 import shlex
@@ -16,11 +16,10 @@ import shutil
 import signal
 import subprocess
 import sys
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import build_telemetry
-import caffeinate
-import gclient_paths
+if TYPE_CHECKING:
+    import build_telemetry
 
 
 _SYSTEM_DICT = {"Windows": "windows", "Darwin": "mac", "Linux": "linux"}
@@ -29,12 +28,14 @@ _SYSTEM_DICT = {"Windows": "windows", "Darwin": "mac", "Linux": "linux"}
 def parse_args(args):
     subcmd = ''
     out_dir = "."
-    for i, arg in enumerate(args):
+    args_iter = iter(args)
+    for arg in args_iter:
         if not arg.startswith("-") and not subcmd:
             subcmd = arg
             continue
         if arg == "-C":
-            out_dir = args[i + 1]
+            # Consume the directory, so it is not taken as the subcommand.
+            out_dir = next(args_iter, out_dir)
         elif arg.startswith("-C"):
             out_dir = arg[2:]
     return subcmd, out_dir
@@ -43,6 +44,9 @@ def parse_args(args):
 # Trivial check if siso contains subcommand.
 # Subcommand completes successfully if subcommand is present, returning 0,
 # and 2 if it's not present.
+# The answer is fixed for a given binary, so it is cached per
+# (siso_path, subc) to avoid spawning siso again for repeated probes.
+@functools.lru_cache(maxsize=None)
 def _is_subcommand_present(siso_path: str, subc: str) -> bool:
     return subprocess.call([siso_path, "help", subc]) == 0
 
@@ -59,20 +63,17 @@ def check_outdir(subcmd, out_dir):
 
 
 def apply_metrics_labels(args: list[str]) -> list[str]:
-    user_system = _SYSTEM_DICT.get(platform.system(), platform.system())
-
     # TODO(ovsienko) - add targets to the processing. For this, the Siso needs to understand lists.
-    for arg in args[1:]:
-        # Respect user provided labels, abort.
-        if arg.startswith("--metrics_labels") or arg.startswith(
-                "-metrics_labels"):
-            return args
+    # Respect user provided labels, abort.
+    if any(
+            arg.startswith(("--metrics_labels", "-metrics_labels"))
+            for arg in args[1:]):
+        return args
 
-    result = []
-    result.append("type=developer")
-    result.append("tool=siso")
-    result.append(f"host_os={user_system}")
-    return args + ["--metrics_labels", ",".join(result)]
+    user_system = _SYSTEM_DICT.get(platform.system(), platform.system())
+    return args + [
+        "--metrics_labels", f"type=developer,tool=siso,host_os={user_system}"
+    ]
 
 
 def apply_telemetry_flags(args: list[str], env: dict[str, str]) -> list[str]:
@@ -84,83 +85,109 @@ def apply_telemetry_flags(args: list[str], env: dict[str, str]) -> list[str]:
     # for googlers. Due to this, the flag is still applied while the
     # issue is being investigated.
     env.setdefault("GOOGLE_API_USE_CLIENT_CERTIFICATE", "false")
-    flags_to_add = []
-    for flag in telemetry_flags:
-        found = False
-        for arg in args:
-            if (arg == f"-{flag}" or arg == f"--{flag}"
-                    or arg.startswith(f"-{flag}=")
-                    or arg.startswith(f"--{flag}=")):
-                found = True
-                break
-        if not found:
-            flags_to_add.append(f"--{flag}")
+    # Collect the names of flags already given as -flag, --flag, -flag=... or
+    # --flag=... in a single pass over the args, along with the values of the
+    # project flags, given either inline or as the next arg.
+    given_flags = set()
+    project_flags = {}
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg.startswith("--"):
+            flag = arg[2:]
+        elif arg.startswith("-"):
+            flag = arg[1:]
+        else:
+            continue
+        flag, has_value, value = flag.partition("=")
+        given_flags.add(flag)
+        if flag in ("metrics_project", "project"):
+            project_flags[flag] = value if has_value else next(args_iter, "")
+    flags_to_add = [
+        f"--{flag}" for flag in telemetry_flags if flag not in given_flags
+    ]
 
     # This is a temporary measure as on new siso versions metrics_project
     # gets set the same as project by default.
     # TODO: remove this code after we make sure all clients are using new siso versions.
-
-    parser = argparse.ArgumentParser()
-
-    parser.add_argument("-metrics_project", "--metrics_project")
-    parser.add_argument("-project", "--project")
     metrics_env_var = "RBE_metrics_project"
     project_env_var = "SISO_PROJECT"
     # If metrics env variable is set, add flags and return.
     if metrics_env_var in env:
         return args + flags_to_add
     # Check if metrics project is set. If so, then add flags and return.
-    known_args, _ = parser.parse_known_args(args)
-    if known_args.metrics_project:
+    if project_flags.get("metrics_project"):
         return args + flags_to_add
-    if known_args.project:
-        return args + flags_to_add + [f"--metrics_project={known_args.project}"]
+    project = project_flags.get("project")
+    if project:
+        return args + flags_to_add + [f"--metrics_project={project}"]
     if project_env_var in env:
         return args + flags_to_add + [f"--metrics_project={env[project_env_var]}"]
     # Default case - no flags are set, so don't add any
     return args
 
 
+def _read_config_file(path: str) -> str:
+    """Returns the text of a small config file, read without the buffered
+    file object layer."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        chunks = []
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks).decode()
+
+
+def _split_sisorc_line(line: str) -> list[str]:
+    """Splits a .sisorc line into args, as shlex.split does."""
+    # Lines without quoting or escapes, i.e. almost all of them, split the
+    # same on whitespace, without constructing a shlex lexer.
+    if '"' in line or "'" in line or "\\" in line:
+        return shlex.split(line)
+    return line.split()
+
+
 def load_sisorc(rcfile):
     if not os.path.exists(rcfile):
         return [], {}
     global_flags = []
     subcmd_flags = {}
-    with open(rcfile) as file:
-        for line in file:
-            line = line.strip()
-            if line.startswith("#"):
-                continue
-            args = shlex.split(line)
-            if len(args) == 0:
-                continue
-            if line.startswith("-"):
-                global_flags.extend(args)
-                continue
-            subcmd_flags[args[0]] = args[1:]
+    for line in _read_config_file(rcfile).splitlines():
+        line = line.strip()
+        if line.startswith("#"):
+            continue
+        args = _split_sisorc_line(line)
+        if len(args) == 0:
+            continue
+        if line.startswith("-"):
+            global_flags.extend(args)
+            continue
+        subcmd_flags[args[0]] = args[1:]
     return global_flags, subcmd_flags
 
 
 def apply_sisorc(global_flags: list[str], subcmd_flags: dict[str, list[str]],
                  args: list[str], subcmd: str) -> list[str]:
-    new_args = []
+    if not args:
+        return []
+    new_args = list(global_flags)
+    flags_for_subcmd = subcmd_flags.get(subcmd, [])
     for arg in args:
-        if not new_args:
-            new_args.extend(global_flags)
-        if arg == subcmd:
-            new_args.append(arg)
-            new_args.extend(subcmd_flags.get(arg, []))
-            continue
         new_args.append(arg)
+        if arg == subcmd:
+            new_args.extend(flags_for_subcmd)
     return new_args
 
 
+@functools.lru_cache(maxsize=None)
 def _fix_system_limits() -> None:
     # On macOS and most Linux distributions, the default limit of open file
     # descriptors is too low (256 and 1024, respectively).
     # This causes a large j value to result in 'Too many open files' errors.
     # Check whether the limit can be raised to a large enough value. If yes,
     # use `resource.setrlimit` to increase the limit when running ninja.
+    # The limit is process-wide, so this only needs to happen once.
     if sys.platform in ["darwin", "linux"]:
         import resource
 
@@ -189,12 +216,19 @@ def _process_args(global_flags: list[str], subcmd_flags: dict[str, list[str]],
     return new_args
 
 
+@functools.lru_cache(maxsize=None)
 def _is_google_corp_machine():
     """This assumes that corp machine has gcert binary in known location."""
     return shutil.which("gcert") is not None
 
 
 def main(args, telemetry_cfg: Optional[build_telemetry.Config] = None):
+    # Imported here so that importing siso for its helpers does not load
+    # gclient_utils and the telemetry config.
+    import build_telemetry
+    import caffeinate
+    import gclient_paths
+
     # Do not raise KeyboardInterrupt on SIGINT so as to give siso time to run
     # cleanup tasks. Siso will be terminated immediately after the second
     # Ctrl-C.
@@ -224,7 +258,7 @@ def main(args, telemetry_cfg: Optional[build_telemetry.Config] = None):
     # detected, we need to split the argument. This means that arguments
     # containing actual spaces are not supported by siso.bat, but that is not a
     # real limitation.
-    if sys.platform.startswith('win') and len(args) == 2:
+    if sys.platform.startswith('win') and len(args) == 2 and ' ' in args[1]:
         args = args[:1] + args[1].split()
 
     # macOS's python sets CPATH, LIBRARY_PATH, SDKROOT implicitly.
@@ -265,23 +299,32 @@ def main(args, telemetry_cfg: Optional[build_telemetry.Config] = None):
                 file=sys.stderr)
             return 1
 
-    for base_path in set(
-        [primary_solution_path, gclient_root_path, gclient_src_root_path]):
-        if not base_path:
-            continue
-        env = environ.copy()
-        sisoenv_path = os.path.join(base_path, 'build', 'config', 'siso',
-                                    '.sisoenv')
-        if not os.path.exists(sisoenv_path):
+    # Deduplicate the candidate paths, keeping them in priority order.
+    base_paths = dict.fromkeys(path for path in (primary_solution_path,
+                                                 gclient_root_path,
+                                                 gclient_src_root_path) if path)
+    siso_exe = 'siso' + gclient_paths.GetExeSuffix()
+    for base_path in base_paths:
+        siso_cfg_dir = os.path.join(base_path, 'build', 'config', 'siso')
+        sisoenv_path = os.path.join(siso_cfg_dir, '.sisoenv')
+        # Open directly instead of stat'ing first; a missing .sisoenv just
+        # moves on to the next candidate.
+        try:
+            sisoenv = _read_config_file(sisoenv_path)
+        except FileNotFoundError:
             continue
-        with open(sisoenv_path) as f:
-            for line in f.readlines():
-                k, v = line.rstrip().split('=', 1)
-                env[k] = v
-        backend_config_dir = os.path.join(base_path, 'build', 'config', 'siso',
-                                          'backend_config')
-        if os.path.exists(backend_config_dir) and not os.path.exists(
-                os.path.join(backend_config_dir, 'backend.star')):
+        overrides = {}
+        for line in sisoenv.splitlines():
+            k, sep, v = line.partition('=')
+            if sep:
+                overrides[k] = v.rstrip()
+        env = environ | overrides
+        backend_config_dir = os.path.join(siso_cfg_dir, 'backend_config')
+        # backend.star is normally present, so test it first; its directory
+        # only needs a stat when it is missing.
+        if not os.path.exists(os.path.join(
+                backend_config_dir,
+                'backend.star')) and os.path.exists(backend_config_dir):
             if _is_google_corp_machine():
                 print(
                     'build/config/siso/backend_config/backend.star does not '
@@ -299,15 +342,13 @@ def main(args, telemetry_cfg: Optional[build_telemetry.Config] = None):
                     file=sys.stderr)
             return 1
         global_flags, subcmd_flags = load_sisorc(
-            os.path.join(base_path, 'build', 'config', 'siso', '.sisorc'))
+            os.path.join(siso_cfg_dir, '.sisorc'))
         processed_args = _process_args(global_flags, subcmd_flags, args[1:],
                                        subcmd, should_collect_logs, env)
         siso_paths = [
             siso_override_path,
-            os.path.join(base_path, 'third_party', 'siso', 'cipd',
-                         'siso' + gclient_paths.GetExeSuffix()),
-            os.path.join(base_path, 'third_party', 'siso',
-                         'siso' + gclient_paths.GetExeSuffix()),
+            os.path.join(base_path, 'third_party', 'siso', 'cipd', siso_exe),
+            os.path.join(base_path, 'third_party', 'siso', siso_exe),
         ]
         for siso_path in siso_paths:
             if siso_path and os.path.isfile(siso_path):
@@ -319,7 +360,8 @@ def main(args, telemetry_cfg: Optional[build_telemetry.Config] = None):
             file=sys.stderr)
         return 1
     if siso_override_path:
-        return caffeinate.call([siso_override_path] + args[1:], env=env)
+        return caffeinate.call([siso_override_path] + args[1:],
+                               env=environ.copy())
 
     print(
         'depot_tools/siso.py: Could not find .sisoenv under build/config/siso '
@@ -17,15 +17,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import auth
 import subprocess2
 
-NOW = datetime.datetime(2019, 10, 17, 12, 30, 59, 0)
-VALID_EXPIRY = NOW + datetime.timedelta(seconds=31)
+NOW = calendar.timegm(datetime.datetime(2019, 10, 17, 12, 30, 59).timetuple())
+VALID_EXPIRY = NOW + 31
 
 
 class AuthenticatorTest(unittest.TestCase):
     def setUp(self):
         mock.patch('subprocess2.check_call').start()
         mock.patch('subprocess2.check_call_out').start()
-        mock.patch('auth.datetime_now', return_value=NOW).start()
+        mock.patch('auth.time_now', return_value=NOW).start()
         self.addCleanup(mock.patch.stopall)
 
     def testHasCachedCredentials_NotLoggedIn(self):
@@ -58,10 +58,9 @@ class AuthenticatorTest(unittest.TestCase):
         subprocess2.check_call_out.assert_not_called()
 
     def testGetAccesstoken_LoggedIn(self):
-        expiry = calendar.timegm(VALID_EXPIRY.timetuple())
         subprocess2.check_call_out.return_value = (json.dumps({
             'token': 'token',
-            'expiry': expiry
+            'expiry': VALID_EXPIRY
         }), '')
         self.assertEqual(auth.Token('token', VALID_EXPIRY),
                          auth.Authenticator().get_access_token())
@@ -73,10 +72,9 @@ class AuthenticatorTest(unittest.TestCase):
                                                       stderr=subprocess2.PIPE)
 
     def testGetAccessToken_DifferentScope(self):
-        expiry = calendar.timegm(VALID_EXPIRY.timetuple())
         subprocess2.check_call_out.return_value = (json.dumps({
             'token': 'token',
-            'expiry': expiry
+            'expiry': VALID_EXPIRY
         }), '')
         self.assertEqual(auth.Token('token', VALID_EXPIRY),
                          auth.Authenticator('custom scopes').get_access_token())
@@ -107,6 +105,22 @@ class AuthenticatorTest(unittest.TestCase):
                 'Authorization': 'Bearer access_token'
             }, mock.ANY, mock.ANY)
 
+    def testAuthorize_DoesNotModifyHeaders(self):
+        http = mock.Mock()
+        http_request = http.request
+        http_request.__name__ = '__name__'
+
+        authenticator = auth.Authenticator()
+        authenticator._access_token = auth.Token('access_token', None)
+
+        authorized = authenticator.authorize(http)
+        headers = {'header': 'value'}
+        authorized.request('https://example.com', headers=headers)
+        authorized.request('https://example.com')
+        self.assertEqual({'header': 'value'}, headers)
+        self.assertEqual({'Authorization': 'Bearer access_token'},
+                         http_request.call_args[0][3])
+
     def testGetIdToken_NotLoggedIn(self):
         subprocess2.check_call_out.side_effect = [
             subprocess2.CalledProcessError(1, ['cmd'], 'cwd', 'stdout',
@@ -123,10 +137,9 @@ class AuthenticatorTest(unittest.TestCase):
         subprocess2.check_call_out.assert_not_called()
 
     def testGetIdToken_LoggedIn(self):
-        expiry = calendar.timegm(VALID_EXPIRY.timetuple())
         subprocess2.check_call_out.return_value = (json.dumps({
             'token': 'token',
-            'expiry': expiry
+            'expiry': VALID_EXPIRY
         }), '')
         self.assertEqual(
             auth.Token('token', VALID_EXPIRY),
@@ -138,6 +151,18 @@ class AuthenticatorTest(unittest.TestCase):
                                                       stdout=subprocess2.PIPE,
                                                       stderr=subprocess2.PIPE)
 
+    def testGetIdToken_NoAudience(self):
+        subprocess2.check_call_out.return_value = (json.dumps({
+            'token': 'token',
+            'expiry': VALID_EXPIRY
+        }), '')
+        self.assertEqual(auth.Token('token', VALID_EXPIRY),
+                         auth.Authenticator().get_id_token())
+        subprocess2.check_call_out.assert_called_with(
+            ['luci-auth', 'token', '-use-id-token', '-json-output', '-'],
+            stdout=subprocess2.PIPE,
+            stderr=subprocess2.PIPE)
+
     def testAuthorize_IdToken(self):
         http = mock.Mock()
         http_request = http.request
@@ -161,24 +186,51 @@ class AuthenticatorTest(unittest.TestCase):
 
 class TokenTest(unittest.TestCase):
     def setUp(self):
-        mock.patch('auth.datetime_now', return_value=NOW).start()
+        mock.patch('auth.time_now', return_value=NOW).start()
         self.addCleanup(mock.patch.stopall)
 
     def testNeedsRefresh_NoExpiry(self):
         self.assertFalse(auth.Token('token', None).needs_refresh())
 
     def testNeedsRefresh_Expired(self):
-        expired = NOW + datetime.timedelta(seconds=30)
+        expired = NOW + 30
         self.assertTrue(auth.Token('token', expired).needs_refresh())
 
     def testNeedsRefresh_Valid(self):
         self.assertFalse(auth.Token('token', VALID_EXPIRY).needs_refresh())
 
+    def testExpiresAt(self):
+        self.assertIsNone(auth.Token('token', None).expires_at)
+        self.assertEqual(datetime.datetime(2019, 10, 17, 12, 31, 30),
+                         auth.Token('token', VALID_EXPIRY).expires_at)
+
+
+class ErrorsTest(unittest.TestCase):
+    def testLoginRequiredError(self):
+        self.assertEqual(
+            'You are not logged in. Please login first by running:\n'
+            '  luci-auth login -scopes "scope"',
+            str(auth.LoginRequiredError('scope')))
+
+    def testLoginRequiredError_Args(self):
+        # Like the Git*Error classes, the message is only built by __str__.
+        e = auth.LoginRequiredError('scope')
+        self.assertEqual((), e.args)
+        self.assertEqual('LoginRequiredError()', repr(e))
+
+    def testGitUnknownError(self):
+        self.assertEqual(
+            'Unknown error from git-credential-luci. Try logging in? Run:\n'
+            '  git credential-luci login', str(auth.GitUnknownError()))
+
 
 class HasLuciContextLocalAuthTest(unittest.TestCase):
     def setUp(self):
         mock.patch('os.environ').start()
+        mock.patch('os.stat', return_value=mock.Mock(st_mtime_ns=1,
+                                                     st_size=2)).start()
         mock.patch('builtins.open', mock.mock_open()).start()
+        auth._luci_context_has_local_auth.cache_clear()
         self.addCleanup(mock.patch.stopall)
 
     def testNoLuciContextEnvVar(self):
@@ -186,6 +238,12 @@ class HasLuciContextLocalAuthTest(unittest.TestCase):
         self.assertFalse(auth.has_luci_context_local_auth())
 
     def testNonexistentPath(self):
+        os.environ = {'LUCI_CONTEXT': 'path'}
+        os.stat.side_effect = OSError
+        self.assertFalse(auth.has_luci_context_local_auth())
+        open.assert_not_called()
+
+    def testUnreadablePath(self):
         os.environ = {'LUCI_CONTEXT': 'path'}
         open.side_effect = OSError
         self.assertFalse(auth.has_luci_context_local_auth())
@@ -245,6 +303,20 @@ class HasLuciContextLocalAuthTest(unittest.TestCase):
         self.assertTrue(auth.has_luci_context_local_auth())
         open.assert_called_with('path')
 
+    def testCachedUntilModified(self):
+        os.environ = {'LUCI_CONTEXT': 'path'}
+        open.return_value.read.return_value = json.dumps(
+            {'local_auth': {
+                'default_account_id': 'task'
+            }})
+        self.assertTrue(auth.has_luci_context_local_auth())
+        self.assertTrue(auth.has_luci_context_local_auth())
+        open.assert_called_once_with('path')
+
+        open.return_value.read.return_value = '{}'
+        os.stat.return_value = mock.Mock(st_mtime_ns=3, st_size=2)
+        self.assertFalse(auth.has_luci_context_local_auth())
+
 
 class GerritAuthenticatorTest(unittest.TestCase):
 
@@ -274,6 +346,41 @@ class GerritAuthenticatorTest(unittest.TestCase):
         # Check that the access token is extracted correctly.
         self.assertEqual(out, "decacafe")
 
+    def testGetAccessToken_Env(self):
+        self._set_gcl_result(exitcode=0,
+                             stdout=b"username=git-luci\npassword=decacafe\n",
+                             stderr=b"")
+        with mock.patch.dict(os.environ, {'SOME_VAR': 'old'}):
+            self.authenticator.get_access_token()
+        with mock.patch.dict(os.environ, {'SOME_VAR': 'new'}):
+            self.authenticator.get_access_token()
+        env = subprocess2.communicate.call_args[1]["env"]
+        # Changed values of existing variables are picked up.
+        self.assertEqual('new', env['SOME_VAR'])
+        self.assertEqual('0', env['LUCI_ENABLE_REAUTH'])
+
+    def testGetAccessToken_ReusedUntilExpiry(self):
+        mock.patch('auth.time_now', return_value=NOW).start()
+        self._set_gcl_result(exitcode=0,
+                             stdout=b"username=git-luci\npassword=decacafe\n"
+                             b"password_expiry_utc=%d\n" % VALID_EXPIRY,
+                             stderr=b"")
+        self.assertEqual("decacafe", self.authenticator.get_access_token())
+        self.assertEqual("decacafe", self.authenticator.get_access_token())
+        self.assertEqual(1, subprocess2.communicate.call_count)
+
+        auth.time_now.return_value = VALID_EXPIRY
+        self.assertEqual("decacafe", self.authenticator.get_access_token())
+        self.assertEqual(2, subprocess2.communicate.call_count)
+
+    def testGetAccessToken_NoExpiry(self):
+        self._set_gcl_result(exitcode=0,
+                             stdout=b"username=git-luci\npassword=decacafe\n",
+                             stderr=b"")
+        self.authenticator.get_access_token()
+        self.authenticator.get_access_token()
+        self.assertEqual(2, subprocess2.communicate.call_count)
+
     def testGetAccessTokenRequiresLogin(self):
         self._set_gcl_result(exitcode=2,
                              stdout=b"",
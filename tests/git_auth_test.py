@@ -7,7 +7,9 @@
 
 from __future__ import annotations
 
+import collections
 from collections.abc import Iterable
+import concurrent.futures
 import io
 import logging
 import os
@@ -15,19 +17,24 @@ import sys
 import tempfile
 from typing import Iterable
 import unittest
+from unittest import mock
 import urllib.parse
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import gerrit_util
 import git_auth
 import scm
 import scm_mock
 
+_DEPOT_TOOLS_URL_PARTS = urllib.parse.urlsplit(
+    'https://chromium.googlesource.com/chromium/tools/depot_tools.git')
+
 
 class TestParseCookiefile(unittest.TestCase):
 
     def test_ignore_comments(self):
-        f = io.StringIO('''\
+        f = io.BytesIO(b'''\
 # chromium.googlesource.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
 ''')
         got = git_auth._parse_cookiefile(f)
@@ -38,7 +45,7 @@ class TestParseCookiefile(unittest.TestCase):
         self.assertEqual(got, want)
 
     def test_gerrit(self):
-        f = io.StringIO('''\
+        f = io.BytesIO(b'''\
 chromium.googlesource.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
 ''')
         got = git_auth._parse_cookiefile(f)
@@ -49,7 +56,7 @@ chromium.googlesource.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fa
         self.assertEqual(got, want)
 
     def test_nongerrit(self):
-        f = io.StringIO('''\
+        f = io.BytesIO(b'''\
 github.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
 ''')
         got = git_auth._parse_cookiefile(f)
@@ -60,7 +67,7 @@ github.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
         self.assertEqual(got, want)
 
     def test_both(self):
-        f = io.StringIO('''\
+        f = io.BytesIO(b'''\
 chromium.googlesource.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
 github.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
 ''')
@@ -71,16 +78,69 @@ github.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
         )
         self.assertEqual(got, want)
 
+    def test_http_only(self):
+        f = io.BytesIO(b'''\
+#HttpOnly_chromium.googlesource.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
+
+\t
+github.com,FALSE,/,TRUE,2147483647,o,git-ayatane.google.com=1//fake-credential
+''')
+        got = git_auth._parse_cookiefile(f)
+        want = git_auth._CookiefileInfo(
+            contains_gerrit=False,
+            contains_nongerrit=True,
+        )
+        self.assertEqual(got, want)
+
+
+class TestUserInterface(unittest.TestCase):
+
+    def test_write_buffered_until_read(self):
+        stdout = io.StringIO()
+        ui = git_auth.UserInterface(stdin=io.StringIO('y\n'), stdout=stdout)
+        ui.write('foo\n')
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertTrue(ui.read_yn('Continue?'))
+        self.assertEqual(stdout.getvalue(), 'foo\nContinue? [y/n]: ')
+        ui.write('bar\n')
+        ui.flush()
+        self.assertEqual(stdout.getvalue(), 'foo\nContinue? [y/n]: bar\n')
+
+    def test_read_yn_responses(self):
+        stdin = io.StringIO('YES\r\nmaybe\nn \n\n')
+        ui = git_auth.UserInterface(stdin=stdin, stdout=io.StringIO())
+        self.assertTrue(ui.read_yn('Continue?'))
+        self.assertFalse(ui.read_yn('Continue?'))
+        self.assertTrue(ui.read_yn('Continue?', default=True))
+
+    def test_read_yn_leading_whitespace(self):
+        ui = git_auth.UserInterface(stdin=io.StringIO(' n\n'),
+                                    stdout=io.StringIO())
+        self.assertFalse(ui.read_yn('Continue?', default=True))
+
 
 class TestConfigWizard(unittest.TestCase):
 
     maxDiff = None
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The gitcookies checks only stat these files, so one pair of real
+        # files is shared by the whole class rather than created per test.
+        tmpdir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmpdir.cleanup)
+        cls.gitcookies = os.path.join(tmpdir.name, 'gitcookies')
+        cls.cookiefile = os.path.join(tmpdir.name, 'cookiefile')
+        for path in (cls.gitcookies, cls.cookiefile):
+            open(path, 'w').close()
+
     def setUp(self):
         super().setUp()
         self._global_state_view: Iterable[tuple[str,
                                                 list[str]]] = scm_mock.GIT(self)
         self.ui = _FakeUI()
+        self._cwd = os.getcwd()
 
         self.wizard = git_auth.ConfigWizard(
             ui=self.ui, remote_url_func=lambda: 'remote.example.com')
@@ -90,8 +150,7 @@ class TestConfigWizard(unittest.TestCase):
         return dict(self._global_state_view)
 
     def test_configure_sso_global(self):
-        parts = urllib.parse.urlsplit(
-            'https://chromium.googlesource.com/chromium/tools/depot_tools.git')
+        parts = _DEPOT_TOOLS_URL_PARTS
         self.wizard._configure_sso(parts, scope='global')
         want = {
             'url.sso://chromium/.insteadof':
@@ -100,8 +159,7 @@ class TestConfigWizard(unittest.TestCase):
         self.assertEqual(self.global_state, want)
 
     def test_configure_oauth_global(self):
-        parts = urllib.parse.urlsplit(
-            'https://chromium.googlesource.com/chromium/tools/depot_tools.git')
+        parts = _DEPOT_TOOLS_URL_PARTS
         self.wizard._configure_oauth(parts, scope='global')
         want = {
             'credential.https://chromium.googlesource.com.helper': ['', 'luci'],
@@ -109,9 +167,17 @@ class TestConfigWizard(unittest.TestCase):
         }
         self.assertEqual(self.global_state, want)
 
+    def test_configure_oauth_global_unchanged(self):
+        parts = _DEPOT_TOOLS_URL_PARTS
+        self.wizard._configure_oauth(parts, scope='global')
+        wizard = git_auth.ConfigWizard(
+            ui=self.ui, remote_url_func=lambda: 'remote.example.com')
+        with mock.patch('scm.GIT.SetConfig') as set_config:
+            wizard._configure_oauth(parts, scope='global')
+            set_config.assert_not_called()
+
     def test_configure_sso_global_oauth_local(self):
-        parts = urllib.parse.urlsplit(
-            'https://chromium.googlesource.com/chromium/tools/depot_tools.git')
+        parts = _DEPOT_TOOLS_URL_PARTS
         self.wizard._configure_sso(parts, scope='global')
         want = {
             'url.sso://chromium/.insteadof':
@@ -121,94 +187,149 @@ class TestConfigWizard(unittest.TestCase):
         self.wizard._configure_oauth(parts, scope='local')
         self.assertEqual(
             scm.GIT.GetConfigList(
-                os.getcwd(),
+                self._cwd,
                 'credential.https://chromium.googlesource.com.helper'),
             ['', 'luci'])
         # Ensure that we're overriding the global overwrite rule
         self.assertEqual(
             scm.GIT.GetConfigList(
-                os.getcwd(),
+                self._cwd,
                 'url.https://chromium.googlesource.com/chromium/tools/depot_tools.git.insteadof'
             ), [
                 'https://chromium.googlesource.com/chromium/tools/depot_tools.git'
             ])
 
+    def test_get_config_cached(self):
+        scm.GIT.SetConfig(self._cwd,
+                          'user.email',
+                          'foo@example.com',
+                          scope='global')
+        self.assertEqual(self.wizard._get_config('user.email', scope='global'),
+                         'foo@example.com')
+        self.assertEqual(self.wizard._get_config('user.email', scope='local'),
+                         '')
+        with mock.patch('scm.GIT.GetConfigList') as get_config_list:
+            self.assertEqual(
+                self.wizard._get_config('user.email', scope='global'),
+                'foo@example.com')
+            get_config_list.assert_not_called()
+
+        self.wizard._set_config('user.email', 'bar@example.com', scope='global')
+        self.assertEqual(self.wizard._get_config('user.email', scope='global'),
+                         'bar@example.com')
+
+    def test_remote_url_func_called_once(self):
+        remote_url_func = mock.Mock(return_value='remote.example.com')
+        wizard = git_auth.ConfigWizard(ui=self.ui,
+                                       remote_url_func=remote_url_func)
+        wizard._remote_url_func()
+        wizard._remote_url_func()
+        remote_url_func.assert_called_once_with()
+
+    def test_check_sso_helper_cached(self):
+        with mock.patch('gerrit_util.ssoHelper.find_cmd',
+                        return_value='/bin/git-remote-sso') as find_cmd:
+            self.assertTrue(self.wizard._check_sso_helper())
+            self.assertTrue(self.wizard._check_sso_helper())
+            find_cmd.assert_called_once_with()
+
+    def test_check_use_sso_started_check(self):
+        parts = urllib.parse.urlsplit('https://chromium.googlesource.com/')
+        sso_check = concurrent.futures.Future()
+        sso_check.set_result(gerrit_util.SSOCheckResult(True, 'test'))
+        self.wizard._sso_helper_available = True
+        with mock.patch('gerrit_util.CheckShouldUseSSO') as check:
+            got = self.wizard._check_use_sso(parts,
+                                             'foo@example.com',
+                                             sso_check=sso_check)
+            check.assert_not_called()
+        self.assertEqual(got, gerrit_util.SSOCheckResult(True, 'test'))
+
+    def test_configure_host_deferred_sso_reason(self):
+        parts = urllib.parse.urlsplit('https://chromium.googlesource.com/')
+        sso_check = concurrent.futures.Future()
+        sso_check.set_result(gerrit_util.SSOCheckResult(False, 'test'))
+        self.wizard._sso_helper_available = True
+        got = self.wizard._configure_host(parts,
+                                          'foo@example.com',
+                                          scope='global',
+                                          sso_check=sso_check,
+                                          report_sso=False)
+        self.assertEqual(
+            got,
+            git_auth._ConfigInfo(method=git_auth._ConfigMethod.OAUTH,
+                                 sso_reason='test'))
+
     def test_check_gitcookies_same(self):
-        with tempfile.NamedTemporaryFile() as gitcookies:
-            self.wizard._gitcookies = lambda: gitcookies.name
-            scm.GIT.SetConfig(os.getcwd(),
-                              'http.cookiefile',
-                              gitcookies.name,
-                              scope='global')
-            got = self.wizard._check_gitcookies()
-            want = git_auth._GitcookiesSituation(
-                gitcookies_exists=True,
-                cookiefile=gitcookies.name,
-                cookiefile_exists=True,
-                divergent_cookiefiles=False,
-            )
-            self.assertEqual(got, want)
+        self.wizard._gitcookies = lambda: self.gitcookies
+        scm.GIT.SetConfig(self._cwd,
+                          'http.cookiefile',
+                          self.gitcookies,
+                          scope='global')
+        got = self.wizard._check_gitcookies()
+        want = git_auth._GitcookiesSituation(
+            gitcookies_exists=True,
+            cookiefile=self.gitcookies,
+            cookiefile_exists=True,
+            divergent_cookiefiles=False,
+        )
+        self.assertEqual(got, want)
 
     def test_check_gitcookies_different(self):
-        with tempfile.NamedTemporaryFile(
-        ) as gitcookies, tempfile.NamedTemporaryFile() as cookiefile:
-            self.wizard._gitcookies = lambda: gitcookies.name
-            scm.GIT.SetConfig(os.getcwd(),
-                              'http.cookiefile',
-                              cookiefile.name,
-                              scope='global')
-            got = self.wizard._check_gitcookies()
-            want = git_auth._GitcookiesSituation(
-                gitcookies_exists=True,
-                cookiefile=cookiefile.name,
-                cookiefile_exists=True,
-                divergent_cookiefiles=True,
-            )
-            self.assertEqual(got, want)
+        self.wizard._gitcookies = lambda: self.gitcookies
+        scm.GIT.SetConfig(self._cwd,
+                          'http.cookiefile',
+                          self.cookiefile,
+                          scope='global')
+        got = self.wizard._check_gitcookies()
+        want = git_auth._GitcookiesSituation(
+            gitcookies_exists=True,
+            cookiefile=self.cookiefile,
+            cookiefile_exists=True,
+            divergent_cookiefiles=True,
+        )
+        self.assertEqual(got, want)
 
     def test_check_gitcookies_missing_gitcookies(self):
-        with tempfile.NamedTemporaryFile() as cookiefile:
-            self.wizard._gitcookies = lambda: '/this-file-does-not-exist-yue'
-            scm.GIT.SetConfig(os.getcwd(),
-                              'http.cookiefile',
-                              cookiefile.name,
-                              scope='global')
-            got = self.wizard._check_gitcookies()
-            want = git_auth._GitcookiesSituation(
-                gitcookies_exists=False,
-                cookiefile=cookiefile.name,
-                cookiefile_exists=True,
-                divergent_cookiefiles=False,
-            )
-            self.assertEqual(got, want)
+        self.wizard._gitcookies = lambda: '/this-file-does-not-exist-yue'
+        scm.GIT.SetConfig(self._cwd,
+                          'http.cookiefile',
+                          self.cookiefile,
+                          scope='global')
+        got = self.wizard._check_gitcookies()
+        want = git_auth._GitcookiesSituation(
+            gitcookies_exists=False,
+            cookiefile=self.cookiefile,
+            cookiefile_exists=True,
+            divergent_cookiefiles=False,
+        )
+        self.assertEqual(got, want)
 
     def test_check_gitcookies_missing_cookiefile(self):
-        with tempfile.NamedTemporaryFile() as gitcookies:
-            self.wizard._gitcookies = lambda: gitcookies.name
-            scm.GIT.SetConfig(os.getcwd(),
-                              'http.cookiefile',
-                              '/this-file-does-not-exist-yue',
-                              scope='global')
-            got = self.wizard._check_gitcookies()
-            want = git_auth._GitcookiesSituation(
-                gitcookies_exists=True,
-                cookiefile='/this-file-does-not-exist-yue',
-                cookiefile_exists=False,
-                divergent_cookiefiles=False,
-            )
-            self.assertEqual(got, want)
+        self.wizard._gitcookies = lambda: self.gitcookies
+        scm.GIT.SetConfig(self._cwd,
+                          'http.cookiefile',
+                          '/this-file-does-not-exist-yue',
+                          scope='global')
+        got = self.wizard._check_gitcookies()
+        want = git_auth._GitcookiesSituation(
+            gitcookies_exists=True,
+            cookiefile='/this-file-does-not-exist-yue',
+            cookiefile_exists=False,
+            divergent_cookiefiles=False,
+        )
+        self.assertEqual(got, want)
 
     def test_check_gitcookies_unset(self):
-        with tempfile.NamedTemporaryFile() as gitcookies:
-            self.wizard._gitcookies = lambda: gitcookies.name
-            got = self.wizard._check_gitcookies()
-            want = git_auth._GitcookiesSituation(
-                gitcookies_exists=True,
-                cookiefile='',
-                cookiefile_exists=False,
-                divergent_cookiefiles=False,
-            )
-            self.assertEqual(got, want)
+        self.wizard._gitcookies = lambda: self.gitcookies
+        got = self.wizard._check_gitcookies()
+        want = git_auth._GitcookiesSituation(
+            gitcookies_exists=True,
+            cookiefile='',
+            cookiefile_exists=False,
+            divergent_cookiefiles=False,
+        )
+        self.assertEqual(got, want)
 
     def test_move_file(self):
         with tempfile.TemporaryDirectory() as d:
@@ -225,15 +346,35 @@ class TestConfigWizard(unittest.TestCase):
             self.wizard._move_file(path)
             self.assertEqual(sorted(os.listdir(d)), ['foo.bak', 'foo.bak2'])
 
+    def test_move_file_missing(self):
+        with tempfile.TemporaryDirectory() as d:
+            with self.assertRaises(FileNotFoundError):
+                self.wizard._move_file(os.path.join(d, 'foo'))
+            self.assertEqual(os.listdir(d), [])
+
+    def test_fix_netrc(self):
+        with tempfile.TemporaryDirectory() as d:
+            open(os.path.join(d, '.netrc'), 'w').close()
+            self.ui.choices.append('y')
+            with mock.patch('git_auth._HOME', d):
+                self.wizard._fix_netrc()
+            self.assertEqual(os.listdir(d), ['.netrc.bak'])
+
+    def test_fix_netrc_missing(self):
+        with tempfile.TemporaryDirectory() as d:
+            with mock.patch('git_auth._HOME', d):
+                self.wizard._fix_netrc()
+            self.assertEqual(os.listdir(d), [])
+
 
 class _FakeUI(object):
     """Implements UserInterface for testing."""
 
     def __init__(self, choices: Iterable[str] = ()):
-        self.choices: list[str] = list(choices)
+        self.choices: collections.deque[str] = collections.deque(choices)
 
     def read_yn(self, prompt: str, *, default: bool | None = None) -> bool:
-        choice = self.choices.pop(0)
+        choice = self.choices.popleft()
         if choice == 'y':
             return True
         if choice == 'n':
@@ -241,11 +382,14 @@ class _FakeUI(object):
         raise Exception(f'invalid choice for yn {choice!r}')
 
     def read_line(self, prompt: str, *, check=lambda *any: True) -> str:
-        return self.choices.pop(0)
+        return self.choices.popleft()
 
     def write(self, s: str) -> None:
         pass
 
+    def flush(self) -> None:
+        pass
+
 
 if __name__ == '__main__':
     logging.basicConfig(
@@ -894,6 +894,25 @@ class CachedGitConfigStateTest(unittest.TestCase):
             ('section.variable', 'value2'),
         ])
 
+    def test_get_list_scoped(self):
+        gcs = self._make()
+
+        gcs.SetConfig('SECTION.VARIABLE', 'value')
+        gcs.SetConfig('SeCtIoN.vArIaBLe', 'gvalue', scope='global')
+        gcs.SetConfig('SeCtIoN.vArIaBLe',
+                      'gvalue2',
+                      append=True,
+                      scope='global')
+        self.assertListEqual(gcs.GetConfigList('section.variable'),
+                             ['gvalue', 'gvalue2', 'value'])
+        self.assertListEqual(
+            gcs.GetConfigList('section.variable', scope='global'),
+            ['gvalue', 'gvalue2'])
+        self.assertListEqual(
+            gcs.GetConfigList('section.variable', scope='local'), ['value'])
+        self.assertListEqual(
+            gcs.GetConfigList('section.variable', scope='worktree'), [])
+
     def test_unset_multi_global(self):
         gcs = self._make()
 
@@ -5,7 +5,6 @@
 
 import io
 import os
-import shlex
 import sys
 import unittest
 import platform
@@ -17,8 +16,10 @@ sys.path.insert(0, ROOT_DIR)
 import siso
 from testing_support import trial_dir
 
+_USER_SYSTEM = siso._SYSTEM_DICT.get(platform.system(), platform.system())
 
-class SisoTest(trial_dir.TestCase):
+
+class LoadSisorcTest(trial_dir.TestCase):
 
     def setUp(self):
         super().setUp()
@@ -36,19 +37,50 @@ class SisoTest(trial_dir.TestCase):
         self.assertEqual(subcmd_flags, {})
 
     def test_load_sisorc(self):
+        sisorc = os.path.join('build', 'config', 'siso', '.sisorc')
+        os.makedirs(os.path.dirname(sisorc))
+        with open(sisorc, 'w') as f:
+            f.write('# c\n'
+                    '\n'
+                    '-credential_helper=gcloud\n'
+                    'ninja --failure_verbose=false -k=0\n')
+        global_flags, subcmd_flags = siso.load_sisorc(sisorc)
+        self.assertEqual(global_flags, ['-credential_helper=gcloud'])
+        self.assertEqual(subcmd_flags,
+                         {'ninja': ['--failure_verbose=false', '-k=0']})
+
+    def test_load_sisorc_quoted(self):
         sisorc = os.path.join('build', 'config', 'siso', '.sisorc')
         os.makedirs(os.path.dirname(sisorc))
         with open(sisorc, 'w') as f:
             f.write("""
-# comment
--credential_helper=gcloud
-ninja --failure_verbose=false -k=0
+-log_dir="/tmp/siso logs"
+ninja --failure_verbose=false '-k=0'
             """)
         global_flags, subcmd_flags = siso.load_sisorc(sisorc)
-        self.assertEqual(global_flags, ['-credential_helper=gcloud'])
+        self.assertEqual(global_flags, ['-log_dir=/tmp/siso logs'])
         self.assertEqual(subcmd_flags,
                          {'ninja': ['--failure_verbose=false', '-k=0']})
 
+
+class SisoTest(unittest.TestCase):
+
+    def test_parse_args(self):
+        test_cases = {
+            'no_args': ([], ('', '.')),
+            'subcmd_only': (['ninja'], ('ninja', '.')),
+            'subcmd_then_dir': (['ninja', '-C',
+                                 'out/Default'], ('ninja', 'out/Default')),
+            'joined_dir': (['ninja',
+                            '-Cout/Default'], ('ninja', 'out/Default')),
+            'dir_then_subcmd': (['-C', 'out/Default',
+                                 'ninja'], ('ninja', 'out/Default')),
+            'missing_dir': (['ninja', '-C'], ('ninja', '.')),
+        }
+        for name, (args, want) in test_cases.items():
+            with self.subTest(name):
+                self.assertEqual(siso.parse_args(args), want)
+
     def test_apply_sisorc_none(self):
         new_args = siso.apply_sisorc([], {}, ['ninja', '-C', 'out/Default'],
                                      'ninja')
@@ -58,6 +90,11 @@ ninja --failure_verbose=false -k=0
         new_args = siso.apply_sisorc([], {'ninja': ['-k=0']}, ['-version'], '')
         self.assertEqual(new_args, ['-version'])
 
+    def test_apply_sisorc_noargs(self):
+        new_args = siso.apply_sisorc(['-credential_helper=luci-auth'],
+                                     {'ninja': ['-k=0']}, [], '')
+        self.assertEqual(new_args, [])
+
     def test_apply_sisorc(self):
         new_args = siso.apply_sisorc(
             ['-credential_helper=luci-auth'], {'ninja': ['-k=0']},
@@ -76,19 +113,20 @@ ninja --failure_verbose=false -k=0
             return 2
 
         mock_call.side_effect = side_effect
+        siso._is_subcommand_present.cache_clear()
         self.assertTrue(siso._is_subcommand_present('siso_path', 'collector'))
         self.assertTrue(siso._is_subcommand_present('siso_path', 'ninja'))
         self.assertFalse(siso._is_subcommand_present('siso_path', 'unknown'))
+        self.assertTrue(siso._is_subcommand_present('siso_path', 'ninja'))
+        self.assertEqual(mock_call.call_count, 3)
 
     def test_apply_metrics_labels(self):
-        user_system = siso._SYSTEM_DICT.get(platform.system(),
-                                            platform.system())
         test_cases = {
             'no_labels': {
                 'args': ['ninja', '-C', 'out/Default'],
                 'want': [
                     'ninja', '-C', 'out/Default', '--metrics_labels',
-                    f'type=developer,tool=siso,host_os={user_system}'
+                    f'type=developer,tool=siso,host_os={_USER_SYSTEM}'
                 ]
             },
             'labels_exist': {
@@ -162,6 +200,34 @@ ninja --failure_verbose=false -k=0
                     '--metrics_project=some_project',
                 ],
             },
+            'cloud_project_set_inline': {
+                'args': ['ninja', '-C', 'out/Default', '-project=some_project'],
+                'env': {},
+                'want': [
+                    'ninja',
+                    '-C',
+                    'out/Default',
+                    '-project=some_project',
+                    '--enable_cloud_monitoring',
+                    '--enable_cloud_profiler',
+                    '--enable_cloud_trace',
+                    '--enable_cloud_logging',
+                    '--metrics_project=some_project',
+                ],
+            },
+            'metrics_project_set_inline': {
+                'args': [
+                    'ninja', '-C', 'out/Default', '--metrics_project=m',
+                    '--project', 'some_project'
+                ],
+                'env': {},
+                'want': [
+                    'ninja', '-C', 'out/Default', '--metrics_project=m',
+                    '--project', 'some_project', '--enable_cloud_monitoring',
+                    '--enable_cloud_profiler', '--enable_cloud_trace',
+                    '--enable_cloud_logging'
+                ],
+            },
             'cloud_project_set_thru_env': {
                 'args': ['ninja', '-C', 'out/Default'],
                 'env': {
@@ -214,8 +280,6 @@ ninja --failure_verbose=false -k=0
         self.assertEqual(env.get("GOOGLE_API_USE_CLIENT_CERTIFICATE"), "false")
 
     def test_process_args(self):
-        user_system = siso._SYSTEM_DICT.get(platform.system(),
-                                            platform.system())
         processed_args = ['-gflag', 'ninja', '-sflag', '-C', 'out/Default']
 
         test_cases = {
@@ -234,7 +298,7 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                 ],
             },
             "ninja_with_logs_no_project": {
@@ -246,7 +310,7 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                 ],
             },
             "ninja_with_logs_with_project_in_args": {
@@ -264,7 +328,7 @@ ninja --failure_verbose=false -k=0
                     "out/Default",
                     "--project=test-project",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                     "--enable_cloud_monitoring",
                     "--enable_cloud_profiler",
                     "--enable_cloud_trace",
@@ -282,7 +346,7 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                     "--enable_cloud_monitoring",
                     "--enable_cloud_profiler",
                     "--enable_cloud_trace",
@@ -299,10 +363,10 @@ ninja --failure_verbose=false -k=0
                 "want": processed_args
                 + [
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                 ],
-                "want_stderr": "depot_tools/siso.py: %s\n"
-                % shlex.join(processed_args),
+                "want_stderr":
+                "depot_tools/siso.py: -gflag ninja -sflag -C out/Default\n",
             },
             "with_sisorc_global_flags_only": {
                 "global_flags": ["-gflag_only"],
@@ -315,10 +379,10 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                 ],
-                "want_stderr": "depot_tools/siso.py: %s\n"
-                % shlex.join(["-gflag_only", "ninja", "-C", "out/Default"]),
+                "want_stderr":
+                "depot_tools/siso.py: -gflag_only ninja -C out/Default\n",
             },
             "with_sisorc_subcmd_flags_only": {
                 "subcmd_flags": {"ninja": ["-sflag_only"]},
@@ -331,10 +395,10 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                 ],
-                "want_stderr": "depot_tools/siso.py: %s\n"
-                % shlex.join(["ninja", "-sflag_only", "-C", "out/Default"]),
+                "want_stderr":
+                "depot_tools/siso.py: ninja -sflag_only -C out/Default\n",
             },
             "with_sisorc_global_and_subcmd_flags_and_telemetry": {
                 "global_flags": ["-gflag_tel"],
@@ -350,15 +414,15 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                     "--metrics_labels",
-                    f"type=developer,tool=siso,host_os={user_system}",
+                    f"type=developer,tool=siso,host_os={_USER_SYSTEM}",
                     "--enable_cloud_monitoring",
                     "--enable_cloud_profiler",
                     "--enable_cloud_trace",
                     "--enable_cloud_logging",
                     "--metrics_project=telemetry-project",
                 ],
-                "want_stderr": "depot_tools/siso.py: %s\n"
-                % shlex.join(["-gflag_tel", "ninja", "-sflag_tel", "-C", "out/Default"]),
+                "want_stderr": ("depot_tools/siso.py: "
+                                "-gflag_tel ninja -sflag_tel -C out/Default\n"),
             },
             "with_sisorc_non_ninja_subcmd": {
                 "global_flags": ["-gflag_non_ninja"],
@@ -374,8 +438,9 @@ ninja --failure_verbose=false -k=0
                     "-C",
                     "out/Default",
                 ],
-                "want_stderr": "depot_tools/siso.py: %s\n"
-                % shlex.join(["-gflag_non_ninja", "other_subcmd", "-sflag_non_ninja", "-C", "out/Default"]),
+                "want_stderr": ("depot_tools/siso.py: -gflag_non_ninja "
+                                "other_subcmd -sflag_non_ninja "
+                                "-C out/Default\n"),
             },
         }
 